@@ -0,0 +1,44 @@
+from flask import Blueprint, jsonify, current_app
+from database import db
+from utils.auth import require_admin
+import click
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# ==== Population analytics (admin) ====
+# Reports are computed offline by `flask analytics mood-trends` (NumPy, see
+# models/analytics.py) and only read here, so serving them costs one find_one.
+
+# GET /api/analytics/mood-trends
+@analytics_bp.route('/analytics/mood-trends', methods=['GET'])
+@require_admin
+def get_mood_trends():
+    """Daily mood distribution, streak histogram and signup-week retention across all users."""
+    report = db.mood_analytics.find_one({"_id": "mood_trends"}, {"_id": 0})
+    if report is None:
+        return jsonify({"error": "Report not generated yet."}), 404
+    return jsonify(report), 200
+
+# ==== CLI ====
+
+# flask analytics mood-trends [--batch-size N] [--weeks N]
+# Run on a schedule (cron, a k8s CronJob); needs numpy.
+@analytics_bp.cli.command('mood-trends')
+@click.option('--batch-size', type=int, default=None, help="Override ANALYTICS_BATCH_SIZE.")
+@click.option('--weeks', type=int, default=None, help="Override ANALYTICS_RETENTION_WEEKS.")
+def mood_trends_command(batch_size, weeks):
+    """Recompute the population mood report from every mood entry and signup."""
+    from models.analytics import run_mood_trends
+    report = run_mood_trends(
+        batch_size=batch_size or current_app.config.get('ANALYTICS_BATCH_SIZE', 100000),
+        weeks=weeks or current_app.config.get('ANALYTICS_RETENTION_WEEKS', 12),
+        max_moods=current_app.config.get('ANALYTICS_MAX_MOODS', 50),
+    )
+    click.echo(
+        f"{report['entries']} entries from {report['users']} users: {len(report['daily'])} days, "
+        f"{len(report['retention'])} cohorts in {report['seconds']} s."
+    )
+
+# ==== Example Usage ====
+# flask --app app analytics mood-trends
+# GET /api/analytics/mood-trends (JWT of a user listed in ADMIN_EMAILS)
@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask
 from flask_cors import CORS
 
@@ -12,9 +13,157 @@ def create_app():
     # Set secret key from .env (for sessions/JWT, etc)
     app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY", "super-secret-key")
 
+    # Dashboard statistics engine: "summary" (precomputed), "pipeline" or "scan"
+    app.config['DASHBOARD_ENGINE'] = os.environ.get("DASHBOARD_ENGINE", "summary")
+
+    # Verified-token cache for the shared require_auth decorator
+    app.config['AUTH_TOKEN_CACHE_SIZE'] = int(os.environ.get("AUTH_TOKEN_CACHE_SIZE", 4096))
+    app.config['AUTH_TOKEN_CACHE_TTL'] = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", 300))
+    # Check that the token's user still exists on every authenticated route
+    app.config['AUTH_CHECK_USER'] = os.environ.get("AUTH_CHECK_USER", "false").lower() == "true"
+
+    # bcrypt cost factor and worker pool (logins beyond BCRYPT_MAX_PENDING get a 503)
+    app.config['BCRYPT_ROUNDS'] = int(os.environ.get("BCRYPT_ROUNDS", 12))
+    app.config['BCRYPT_POOL_WORKERS'] = int(os.environ.get("BCRYPT_POOL_WORKERS", 2))
+    app.config['BCRYPT_MAX_PENDING'] = int(os.environ.get("BCRYPT_MAX_PENDING", 16))
+
+    # Per-worker cache of user documents for GET /api/profile and GET /api/settings
+    app.config['USER_CACHE_SIZE'] = int(os.environ.get("USER_CACHE_SIZE", 4096))
+    app.config['USER_CACHE_TTL'] = int(os.environ.get("USER_CACHE_TTL", 30))
+
+    # Mood entry storage: "documents" (one per entry) or "buckets" (per user and month)
+    app.config['MOODS_STORAGE'] = os.environ.get("MOODS_STORAGE", "documents")
+    app.config['MOODS_BUCKET_SIZE'] = int(os.environ.get("MOODS_BUCKET_SIZE", 500))
+
+    # Largest page size accepted by GET /api/moods
+    app.config['MOODS_MAX_LIMIT'] = int(os.environ.get("MOODS_MAX_LIMIT", 100))
+    # POST /api/moods/import: insert_many batch size and entries accepted per request
+    app.config['MOODS_IMPORT_BATCH_SIZE'] = int(os.environ.get("MOODS_IMPORT_BATCH_SIZE", 500))
+    app.config['MOODS_IMPORT_MAX_ITEMS'] = int(os.environ.get("MOODS_IMPORT_MAX_ITEMS", 10000))
+
+    # Cursor batch size for streaming exports
+    app.config['EXPORT_BATCH_SIZE'] = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+
+    # GET /api/resources response cache; workers re-check the catalog version this often
+    app.config['RESOURCES_CACHE'] = os.environ.get("RESOURCES_CACHE", "true").lower() == "true"
+    app.config['RESOURCES_VERSION_POLL_SECONDS'] = float(os.environ.get("RESOURCES_VERSION_POLL_SECONDS", 1))
+
+    # Chat logs are written behind the response in batches (insert_many)
+    app.config['CHATLOG_WRITE_BEHIND'] = os.environ.get("CHATLOG_WRITE_BEHIND", "true").lower() == "true"
+    app.config['CHATLOG_BUFFER_SIZE'] = int(os.environ.get("CHATLOG_BUFFER_SIZE", 10000))
+    app.config['CHATLOG_BATCH_SIZE'] = int(os.environ.get("CHATLOG_BATCH_SIZE", 500))
+    app.config['CHATLOG_FLUSH_INTERVAL'] = float(os.environ.get("CHATLOG_FLUSH_INTERVAL", 0.5))
+
+    # Chat log retention: `flask chatbot compact-chatlogs` moves chats older than
+    # CHATLOG_HOT_DAYS into compressed archive segments of CHATLOG_SEGMENT_SIZE chats
+    app.config['CHATLOG_HOT_DAYS'] = int(os.environ.get("CHATLOG_HOT_DAYS", 30))
+    app.config['CHATLOG_SEGMENT_SIZE'] = int(os.environ.get("CHATLOG_SEGMENT_SIZE", 5000))
+    app.config['CHATLOG_ARCHIVE_BLOCK_SIZE'] = int(os.environ.get("CHATLOG_ARCHIVE_BLOCK_SIZE", 256))
+    # "gzip" or "zstd" (needs the zstandard package)
+    app.config['CHATLOG_ARCHIVE_CODEC'] = os.environ.get("CHATLOG_ARCHIVE_CODEC", "gzip")
+
+    # Chatbot intent rules: a JSON file path or "mongodb:<collection>"
+    app.config['CHATBOT_INTENTS_SOURCE'] = os.environ.get("CHATBOT_INTENTS_SOURCE")
+    app.config['CHATBOT_INTENTS_RELOAD_SECONDS'] = float(os.environ.get("CHATBOT_INTENTS_RELOAD_SECONDS", 5))
+
+    # Comma-separated emails of users allowed on admin endpoints (GET /api/analytics/...)
+    app.config['ADMIN_EMAILS'] = {
+        email.strip() for email in os.environ.get("ADMIN_EMAILS", "").split(",") if email.strip()
+    }
+    # `flask analytics mood-trends`: rows per cursor batch and retention weeks per cohort
+    app.config['ANALYTICS_BATCH_SIZE'] = int(os.environ.get("ANALYTICS_BATCH_SIZE", 100000))
+    app.config['ANALYTICS_RETENTION_WEEKS'] = int(os.environ.get("ANALYTICS_RETENTION_WEEKS", 12))
+    # Distinct mood labels in the report; rarer ones are counted together as "other"
+    app.config['ANALYTICS_MAX_MOODS'] = int(os.environ.get("ANALYTICS_MAX_MOODS", 50))
+
+    # GET /api/metrics (Prometheus text format) and the instrumentation behind it
+    app.config['METRICS_ENABLED'] = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    # Mongo commands slower than this are counted and logged
+    app.config['MONGO_SLOW_COMMAND_MS'] = float(os.environ.get("MONGO_SLOW_COMMAND_MS", 100))
+
+    # Admission control: per-user token buckets and per-endpoint concurrency limits
+    # (see utils/admission.py for the defaults; ADMISSION_LIMITS is a JSON override).
+    # Off by default: behind a load balancer it also needs TRUSTED_PROXIES (below)
+    app.config['ADMISSION_ENABLED'] = os.environ.get("ADMISSION_ENABLED", "false").lower() == "true"
+    app.config['ADMISSION_LIMITS'] = os.environ.get("ADMISSION_LIMITS")
+    # "memory" (per process) or "mongodb" (shared by all workers)
+    app.config['ADMISSION_BACKEND'] = os.environ.get("ADMISSION_BACKEND", "memory")
+    app.config['ADMISSION_RETRY_AFTER'] = int(os.environ.get("ADMISSION_RETRY_AFTER", 1))
+    # Number of reverse proxies / load balancers in front of the app. Their
+    # X-Forwarded-For/-Proto/-Host headers are trusted, so per-IP limits (login,
+    # signup) key on the real client instead of the balancer. Leave 0 when clients
+    # connect directly: the headers can be forged.
+    app.config['TRUSTED_PROXIES'] = int(os.environ.get("TRUSTED_PROXIES", 0))
+
+    # ASGI mode (asgi.py): threads serving the routes that have no native async handler
+    app.config['ASGI_WSGI_THREADS'] = int(os.environ.get("ASGI_WSGI_THREADS", 32))
+
+    # Create required MongoDB indexes when the app starts
+    app.config['MONGO_ENSURE_INDEXES'] = os.environ.get("MONGO_ENSURE_INDEXES", "false").lower() == "true"
+
+    # Finish building the app (extensions, blueprints, PyMongo) on the first request
+    # instead of at startup; /api/health answers meanwhile. Always eager under the flask CLI.
+    # Set false with gunicorn --preload, where loading once in the master is cheaper.
+    app.config['APP_LAZY_LOAD'] = os.environ.get("APP_LAZY_LOAD", "true").lower() == "true"
+    # GET /api/ready fails if MongoDB doesn't answer a ping within this many seconds
+    app.config['READINESS_TIMEOUT'] = float(os.environ.get("READINESS_TIMEOUT", 2))
+
     # Allow CORS (configure allowed origins in production!)
     CORS(app, supports_credentials=True)
 
+    if app.config['TRUSTED_PROXIES']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        proxies = app.config['TRUSTED_PROXIES']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+    # Liveness: the process is up (see utils/startup.py for the answer given before loading)
+    @app.route("/api/health", methods=["GET"])
+    def health():
+        return {"status": "ok"}, 200
+
+    # Readiness: the app is loaded and MongoDB answers
+    @app.route("/api/ready", methods=["GET"])
+    def ready():
+        from database import ping
+        try:
+            ping(app.config['READINESS_TIMEOUT'])
+        except Exception as e:
+            return {"status": "unavailable", "error": str(e)}, 503
+        return {"status": "ready"}, 200
+
+    if app.config['APP_LAZY_LOAD'] and click.get_current_context(silent=True) is None:
+        from utils.startup import defer_loading
+        defer_loading(app, load_app)
+    else:
+        load_app(app)
+    return app
+
+def load_app(app):
+    """Everything that needs the heavy imports: extensions, blueprints and CLI commands."""
+    # Fast JSON encoding with native ObjectId/datetime support
+    from utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    if app.config['METRICS_ENABLED']:
+        from utils.metrics import init_metrics
+        init_metrics(app)
+
+    from utils.auth import init_auth
+    from utils.passwords import init_passwords
+    from utils.write_behind import init_chatlog_buffer
+    from utils.intents import init_intents
+    from models.user import init_user_cache
+    from models.mood_store import init_mood_store
+    init_auth(app)
+    init_passwords(app)
+    init_chatlog_buffer(app)
+    init_intents(app)
+    init_user_cache(app)
+    init_mood_store(app)
+    if app.config['ADMISSION_ENABLED']:
+        from utils.admission import init_admission
+        init_admission(app)
+
     # Import and register Blueprints
     from auth import auth_bp
     from profile import profile_bp
@@ -23,6 +172,8 @@ def create_app():
     from resources import resources_bp
     from dashboard import dashboard_bp
     from settings import settings_bp
+    from export import export_bp
+    from analytics import analytics_bp
 
     # Register Blueprints with common prefix
     app.register_blueprint(auth_bp, url_prefix='/api')
@@ -32,13 +183,14 @@ def create_app():
     app.register_blueprint(resources_bp, url_prefix='/api')
     app.register_blueprint(dashboard_bp, url_prefix='/api')
     app.register_blueprint(settings_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
 
-    # Health check endpoint
-    @app.route("/api/health", methods=["GET"])
-    def health():
-        return {"status": "ok"}, 200
-
-    return app
+    # Index manager: `flask indexes ensure|verify`, optionally run at startup
+    from indexes import indexes_cli, ensure_indexes
+    app.cli.add_command(indexes_cli)
+    if app.config['MONGO_ENSURE_INDEXES']:
+        ensure_indexes()
 
 if __name__ == "__main__":
     # Run app (debug=True for development only!)
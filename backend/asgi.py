@@ -0,0 +1,359 @@
+"""
+ASGI entry point: the same /api/* routes and JSON contracts as app.py, served
+from an event loop.
+
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000 --workers 4
+
+Hot, I/O-bound routes (login, chatbot, dashboard, moods paging, health) run as
+coroutines on PyMongo's asyncio client, so a request waiting on MongoDB does
+not hold a thread. bcrypt runs on the password pool and summary rebuilds on the
+default executor. Every other route is handed to the Flask app on a bounded
+thread pool (ASGI_WSGI_THREADS), including CORS preflights.
+"""
+import asyncio
+import datetime
+import io
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from flask import current_app
+from bson import ObjectId
+from bson.errors import InvalidId
+import jwt
+from database import get_async_db
+from utils.admission import AdmissionRejected, MemoryBucketStore, forwarded_client
+from utils.auth import decode_token
+from utils.json_provider import dumps_bytes, loads
+from utils.passwords import get_hasher, PasswordPoolBusy
+from auth import generate_jwt, rehash_password_if_needed
+from chatbot import basic_bot_response
+from models.mood import compute_summary, dashboard_payload
+from models.mood_store import get_mood_store
+from mood import parse_page_args, moods_page
+from utils.startup import ensure_loaded
+
+logger = logging.getLogger(__name__)
+
+# ==== Request / response ====
+class AsyncRequest:
+    """The parts of an ASGI HTTP request the native handlers need."""
+
+    def __init__(self, scope, body):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = dict(parse_qsl(scope["query_string"].decode('latin-1')))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope["headers"]}
+        self.body = body
+
+    def get_json(self):
+        """Parsed JSON body, or None if it is missing or malformed."""
+        try:
+            return loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+def json_response(body, status=200, headers=()):
+    """(status, headers, body) in the same encoding as the Flask JSON provider."""
+    return status, [("Content-Type", "application/json"), *headers], dumps_bytes(body) + b"\n"
+
+def _bad_json():
+    return json_response({"error": "Request body must be JSON."}, 400)
+
+# ==== Auth ====
+async def authenticate(request):
+    """Async twin of utils.auth.require_auth: returns (user_id, None) or (None, error response)."""
+    parts = request.headers.get('authorization', '').split()
+    if len(parts) != 2 or parts[0] != "Bearer":
+        return None, json_response({'error': 'Token is missing!'}, 401)
+    try:
+        user_id = decode_token(parts[1])['user_id']
+    except jwt.ExpiredSignatureError:
+        return None, json_response({'error': 'Token expired.'}, 401)
+    except Exception:
+        return None, json_response({'error': 'Token is invalid.'}, 401)
+    if current_app.config.get('AUTH_CHECK_USER', False) and not await _user_exists(user_id):
+        return None, json_response({'error': 'User not found.'}, 404)
+    return user_id, None
+
+async def _user_exists(user_id):
+    cache = current_app.extensions['auth']["users"]
+    if cache.get(user_id):
+        return True
+    try:
+        found = await get_async_db().users.find_one({'_id': ObjectId(user_id)}, {'_id': 1}) is not None
+    except InvalidId:
+        return False
+    if found:
+        cache.set(user_id, True)
+    return found
+
+def _password_pool_busy():
+    retry_after = str(current_app.config.get('BCRYPT_RETRY_AFTER', 1))
+    return json_response({"error": "Server is busy, please retry shortly."}, 503, [("Retry-After", retry_after)])
+
+# ==== Native routes ====
+ROUTES = {}
+
+def route(method, path, endpoint):
+    """Register a coroutine handler; endpoint names match the Flask ones for metrics."""
+    def register(handler):
+        ROUTES[(method, path)] = (endpoint, handler)
+        return handler
+    return register
+
+# GET /api/health
+@route("GET", "/api/health", "health")
+async def health(request):
+    return json_response({"status": "ok"})
+
+# POST /api/login {email, password}
+@route("POST", "/api/login", "auth.login")
+async def login(request):
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return _bad_json()
+    email = data.get('email')
+    password = data.get('password')
+
+    user = await get_async_db().users.find_one({'email': email})
+    if not user:
+        return json_response({"error": "Invalid credentials"}, 401)
+    try:
+        matches = await asyncio.wrap_future(get_hasher().verify_async(password, user['password']))
+    except PasswordPoolBusy:
+        return _password_pool_busy()
+    if not matches:
+        return json_response({"error": "Invalid credentials"}, 401)
+    rehash_password_if_needed(user["_id"], password, user["password"])
+
+    user.pop("password")
+    token = generate_jwt(user["_id"], email)
+    return json_response({"user": user, "token": token})
+
+# POST /api/chatbot {message, mood}
+@route("POST", "/api/chatbot", "chatbot.chatbot_reply")
+async def chatbot_reply(request):
+    user_id, error = await authenticate(request)
+    if error:
+        return error
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return _bad_json()
+    message = data.get("message", "")
+    mood = data.get("mood", None)
+
+    bot_response = basic_bot_response(message, mood)
+    chat_entry = {
+        "user_id": user_id,
+        "message": message,
+        "bot_response": bot_response,
+        "timestamp": datetime.datetime.utcnow(),
+        "mood": mood
+    }
+    # Same write-behind buffer as the Flask view; never block the loop when it is full
+    buffer = current_app.extensions.get('chatlog_buffer')
+    if buffer is None or not buffer.put_nowait(chat_entry):
+        await get_async_db().chatlogs.insert_one(chat_entry)
+    return json_response({"response": bot_response})
+
+# GET /api/dashboard
+@route("GET", "/api/dashboard", "dashboard.get_dashboard")
+async def get_dashboard(request):
+    user_id, error = await authenticate(request)
+    if error:
+        return error
+    engine = current_app.config.get('DASHBOARD_ENGINE', 'summary')
+    summary = None
+    if engine == 'summary':
+        summary = await get_async_db().mood_summaries.find_one({"user_id": user_id}, {"_id": 0})
+    if summary is None:
+        # Rebuilds and the pipeline/scan engines keep using the sync models, off the loop
+        summary = await asyncio.get_running_loop().run_in_executor(None, compute_summary, user_id, engine)
+    return json_response(dashboard_payload(summary))
+
+# GET /api/moods?limit=30&cursor=...&from=...&to=...
+@route("GET", "/api/moods", "mood.get_moods")
+async def get_moods(request):
+    user_id, error = await authenticate(request)
+    if error:
+        return error
+    try:
+        limit, start, end, before = parse_page_args(request.args, current_app.config.get('MOODS_MAX_LIMIT', 100))
+    except ValueError as e:
+        return json_response({"error": str(e)}, 400)
+    moods = await get_mood_store().page_async(get_async_db(), user_id, limit + 1, start, end, before)
+    return json_response(moods_page(moods, limit))
+
+# ==== WSGI fallback ====
+def _environ(scope, body):
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode('utf-8').decode('latin-1'),
+        "PATH_INFO": scope["path"].encode('utf-8').decode('latin-1'),
+        "QUERY_STRING": scope["query_string"].decode('latin-1'),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "SERVER_NAME": scope["server"][0] if scope.get("server") else "localhost",
+        "SERVER_PORT": str(scope["server"][1]) if scope.get("server") else "80",
+        "REMOTE_ADDR": scope["client"][0] if scope.get("client") else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode('latin-1').upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = "HTTP_" + name
+        value = value.decode('latin-1')
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+def _run_wsgi(flask_app, environ, send_threadsafe):
+    """Run the Flask app in a worker thread, streaming its body back to the loop."""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    result = flask_app.wsgi_app(environ, start_response)
+    try:
+        send_threadsafe({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        for chunk in result:
+            if chunk:
+                send_threadsafe({"type": "http.response.body", "body": chunk, "more_body": True})
+        send_threadsafe({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+
+# ==== Application ====
+class MindCareASGI:
+    """Dispatches to native coroutine handlers, falling back to the Flask app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.metrics = flask_app.extensions.get('metrics')
+        self.admission = flask_app.extensions.get('admission')
+        self.wsgi_executor = ThreadPoolExecutor(
+            flask_app.config.get('ASGI_WSGI_THREADS', 32), thread_name_prefix="wsgi"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        native = ROUTES.get((scope["method"], scope["path"]))
+        if native is None:
+            loop = asyncio.get_running_loop()
+            send_threadsafe = lambda message: asyncio.run_coroutine_threadsafe(send(message), loop).result()
+            await loop.run_in_executor(
+                self.wsgi_executor, _run_wsgi, self.flask_app, _environ(scope, body), send_threadsafe
+            )
+            return
+
+        endpoint, handler = native
+        request = AsyncRequest(scope, body)
+        start = time.perf_counter()
+        with self.flask_app.app_context():
+            try:
+                admitted = await self._admit(endpoint, request, scope)
+            except AdmissionRejected as e:
+                status, headers, payload = json_response({"error": e.message}, e.status,
+                                                         [("Retry-After", str(e.retry_after))])
+            else:
+                try:
+                    status, headers, payload = await handler(request)
+                except Exception:
+                    logger.exception("Unhandled error in %s %s", request.method, request.path)
+                    status, headers, payload = json_response({"error": "Internal server error."}, 500)
+                finally:
+                    if admitted:
+                        self.admission.leave(endpoint)
+        self._record(endpoint, request.method, status, time.perf_counter() - start)
+
+        headers = list(headers) + [("Content-Length", str(len(payload)))]
+        origin = request.headers.get("origin")
+        if origin:
+            # Same headers Flask-CORS adds with supports_credentials=True
+            headers += [("Access-Control-Allow-Origin", origin), ("Access-Control-Allow-Credentials", "true"),
+                        ("Vary", "Origin")]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _admit(self, endpoint, request, scope):
+        """Same admission control as the Flask before_request hook (utils/admission.py)."""
+        if self.admission is None:
+            return False
+        user_key = None
+        parts = request.headers.get('authorization', '').split()
+        if len(parts) == 2 and parts[0] == "Bearer":
+            try:
+                user_key = decode_token(parts[1]).get("user_id")
+            except Exception:
+                pass
+        ip_key = forwarded_client(
+            scope["client"][0] if scope.get("client") else None,
+            request.headers.get("x-forwarded-for"),
+            self.flask_app.config.get('TRUSTED_PROXIES', 0),
+        )
+        if isinstance(self.admission.store, MemoryBucketStore):
+            return self.admission.enter(endpoint, user_key, ip_key)
+        # The shared store talks to MongoDB synchronously; keep it off the loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.admission.enter, endpoint, user_key, ip_key
+        )
+
+    def _record(self, endpoint, method, status, seconds):
+        if self.metrics is None:
+            return
+        blueprint = endpoint.split(".", 1)[0] if "." in endpoint else "app"
+        self.metrics.observe(
+            "http_request_duration_seconds",
+            (("blueprint", blueprint), ("endpoint", endpoint), ("method", method)),
+            seconds,
+        )
+        self.metrics.inc("http_requests_total", (("endpoint", endpoint), ("status", status)))
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                buffer = self.flask_app.extensions.get('chatlog_buffer')
+                if buffer is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, buffer.close)
+                self.wsgi_executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_asgi_app(flask_app=None):
+    """Build the ASGI application around a Flask app (create_app() by default)."""
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    # The native routes use the app's extensions directly, so load it up front
+    ensure_loaded(flask_app)
+    return MindCareASGI(flask_app)
+
+# ==== Example Usage ====
+# uvicorn --factory asgi:create_asgi_app --port 5000
+# Same API as `python app.py`: POST /api/login, GET /api/dashboard, POST /api/chatbot, ...
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
+from pymongo.errors import DuplicateKeyError
 from database import db
-import bcrypt
+from utils.passwords import get_hasher, PasswordPoolBusy
 import jwt
 import datetime
 import os
@@ -19,9 +20,38 @@ def generate_jwt(user_id, email):
     token = jwt.encode(payload, secret, algorithm="HS256")
     return token
 
+def hash_password(password):
+    """Hash a password on the bcrypt worker pool."""
+    return get_hasher().hash(password)
+
 def verify_password(password, hashed):
-    """Check plain password against hashed."""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed)
+    """Check plain password against hashed (on the bcrypt worker pool)."""
+    return get_hasher().verify(password, hashed)
+
+def rehash_password_if_needed(user_id, password, hashed):
+    """
+    After a successful login, re-hash in the background if BCRYPT_ROUNDS changed.
+    Skipped when the pool is busy; the next login will try again.
+    """
+    hasher = get_hasher()
+    if not hasher.needs_rehash(hashed):
+        return
+    try:
+        future = hasher.hash_async(password)
+    except PasswordPoolBusy:
+        return
+
+    def save(done):
+        if done.exception() is None:
+            db.users.update_one({'_id': user_id}, {'$set': {'password': done.result()}})
+    future.add_done_callback(save)
+
+# Too many logins/signups in flight: shed load instead of queueing
+@auth_bp.errorhandler(PasswordPoolBusy)
+def password_pool_busy(e):
+    response = jsonify({"error": "Server is busy, please retry shortly."})
+    response.headers['Retry-After'] = str(current_app.config.get('BCRYPT_RETRY_AFTER', 1))
+    return response, 503
 
 # ==== Endpoints ====
 
@@ -41,7 +71,7 @@ def signup():
         return jsonify({"error": "User already exists"}), 409
 
     # Hash the password
-    hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    hashed_pw = hash_password(password)
 
     # Create user
     user = {
@@ -50,8 +80,11 @@ def signup():
         "password": hashed_pw,
         "created_at": datetime.datetime.utcnow()
     }
-    result = db.users.insert_one(user)
-    user["_id"] = str(result.inserted_id)
+    try:
+        result = db.users.insert_one(user)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup (unique email index)
+        return jsonify({"error": "User already exists"}), 409
     user.pop("password")  # Do not return password hash
 
     # Generate token
@@ -69,8 +102,8 @@ def login():
     user = db.users.find_one({'email': email})
     if not user or not verify_password(password, user['password']):
         return jsonify({"error": "Invalid credentials"}), 401
+    rehash_password_if_needed(user["_id"], password, user["password"])
 
-    user["_id"] = str(user["_id"])
     user.pop("password")
     token = generate_jwt(user["_id"], email)
 
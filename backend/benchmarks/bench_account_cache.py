@@ -0,0 +1,78 @@
+"""
+Benchmark: MongoDB round trips per request for GET/PUT /api/profile and /api/settings.
+
+Replays page loads (GET profile + GET settings) with an occasional settings
+change, with the per-worker user cache disabled (USER_CACHE_TTL=0) and enabled.
+PUTs are a single find_one_and_update either way (they used to be update_one
+followed by find_one).
+
+Usage (from backend/):
+    python benchmarks/bench_account_cache.py [--mongomock] [--users 50] [--page-loads 20]
+"""
+import argparse
+import os
+import random
+import time
+from collections import defaultdict
+from common import make_app, describe
+
+def run(app, args, ops):
+    client = app.test_client()
+    tokens = []
+    for i in range(args.users):
+        response = client.post("/api/signup", json={"name": f"Cache {i}", "email": f"cache{i}@example.com",
+                                                    "password": "bench-password"})
+        if response.status_code == 409:
+            response = client.post("/api/login", json={"email": f"cache{i}@example.com", "password": "bench-password"})
+        tokens.append(response.get_json()["token"])
+
+    rng = random.Random(1)
+    samples = defaultdict(list)
+    op_counts = defaultdict(int)
+    for _ in range(args.page_loads):
+        for token in tokens:
+            headers = {"Authorization": f"Bearer {token}"}
+            steps = [("GET /api/profile", "get", "/api/profile", None),
+                     ("GET /api/settings", "get", "/api/settings", None)]
+            if rng.random() < args.write_ratio:
+                steps.append(("PUT /api/settings", "put", "/api/settings", {"dark_mode": rng.random() < 0.5}))
+            for name, method, path, body in steps:
+                before = ops.count
+                start = time.perf_counter()
+                response = getattr(client, method)(path, json=body, headers=headers)
+                samples[name].append(time.perf_counter() - start)
+                op_counts[name] += ops.count - before
+                assert response.status_code == 200, (path, response.status_code)
+    return {name: (op_counts[name] / len(bucket), describe(bucket)) for name, bucket in samples.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--page-loads", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    import database
+    from loadtest import CommandCounter, count_mongomock_ops
+    if args.mongomock:
+        ops = count_mongomock_ops()
+    else:
+        ops = CommandCounter()
+        database.add_event_listener(ops)
+    # Read by create_app()
+    os.environ["BCRYPT_ROUNDS"] = "4"
+    results = {}
+    for label, ttl in (("no cache", "0"), ("cache", "30")):
+        os.environ["USER_CACHE_TTL"] = ttl
+        results[label] = run(make_app(use_mongomock=args.mongomock), args, ops)
+
+    for name in results["cache"]:
+        line = []
+        for label, result in results.items():
+            per_request, stats = result[name]
+            line.append(f"{label}: {per_request:4.2f} ops/req p50 {stats['p50']:6.3f} ms")
+        print(f"{name:>18} | " + " | ".join(line))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark: open connections each serving mode sustains at equal p99.
+
+Runs the threaded WSGI server (app.py) and the ASGI app (asgi.py under uvicorn)
+one after the other, each in its own process on this box and against the same
+MONGO_URI. For each level in --levels it keeps that many keep-alive connections
+busy with chat/dashboard/moods requests for --duration seconds, then reports
+throughput and latency. The headline number is the largest level whose p99
+stays under --p99-ms.
+
+Needs a real MongoDB (PyMongo's asyncio client has no mongomock equivalent)
+and uvicorn for the ASGI mode.
+
+Usage (from backend/):
+    python benchmarks/bench_async_mode.py [--levels 16,64,256,1024] [--p99-ms 250] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from common import call, describe
+
+STEPS = [
+    ("POST", "/api/chatbot", {"message": "I feel anxious about tomorrow"}),
+    ("GET", "/api/dashboard", None),
+    ("GET", "/api/moods?limit=30", None),
+]
+
+# ==== Servers ====
+def serve_forever(mode, port):
+    """Child process: run one serving mode until killed."""
+    # Measure serving, not the limiter (see common.make_app)
+    os.environ.setdefault("ADMISSION_ENABLED", "false")
+    if mode == "asgi":
+        import uvicorn
+        uvicorn.run("asgi:create_asgi_app", factory=True, host="127.0.0.1", port=port, log_level="warning")
+    else:
+        from werkzeug.serving import run_simple, WSGIRequestHandler
+        from app import create_app
+        # Keep-alive, like the ASGI server, so both modes hold the same connections open
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        run_simple("127.0.0.1", port, create_app(), threaded=True)
+
+def start_server(mode, port):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", mode, "--port", str(port)],
+        cwd=backend, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if call(base_url, "GET", "/api/health")[0] == 200:
+                return base_url, process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+# ==== Load ====
+async def connection(port, tokens, deadline, rng, samples, errors):
+    """One keep-alive connection issuing requests back to back until the deadline."""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            method, path, body = rng.choice(STEPS)
+            payload = json.dumps(body).encode() if body is not None else b""
+            start = time.perf_counter()
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                f"Authorization: Bearer {rng.choice(tokens)}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode('latin-1').split("\r\n")
+            headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+            await reader.readexactly(int(headers.get("content-length", 0)))
+            samples.append(time.perf_counter() - start)
+            if int(lines[0].split()[1]) >= 400:
+                errors.append(1)
+            if headers.get("connection") == "close" or lines[0].startswith("HTTP/1.0"):
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            errors.append(1)
+            writer = None
+    if writer is not None:
+        writer.close()
+
+async def run_level(port, tokens, level, duration, seed):
+    samples, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        connection(port, tokens, deadline, random.Random(seed + i), samples, errors)
+        for i in range(level)
+    ))
+    return samples, len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--serve", choices=["wsgi", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=5101)
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--levels", default="16,64,256,1024")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--p99-ms", type=float, default=250)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--max-moods", type=int, default=1000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    parser.add_argument("--no-seed", action="store_true", help="Reuse data from a previous run.")
+    args = parser.parse_args()
+    if args.serve:
+        return serve_forever(args.serve, args.port)
+
+    import database
+    from loadtest import seed, PASSWORD
+    if not args.no_seed:
+        seed(database.get_db(), argparse.Namespace(
+            users=args.users, max_moods=args.max_moods, bcrypt_rounds=args.bcrypt_rounds, resources=50,
+        ), random.Random(1))
+    emails = [f"load{i}@example.com" for i in range(args.users)]
+
+    levels = [int(level) for level in args.levels.split(",")]
+    for offset, mode in enumerate(args.modes.split(",")):
+        port = args.port + offset
+        base_url, process = start_server(mode, port)
+        try:
+            tokens = [call(base_url, "POST", "/api/login", {"email": email, "password": PASSWORD})[2]["token"]
+                      for email in emails]
+            sustained = 0
+            print(f"{mode}:")
+            for level in levels:
+                samples, errors = asyncio.run(run_level(port, tokens, level, args.duration, seed=level))
+                stats = describe(samples)
+                ok = stats["p99"] <= args.p99_ms and not errors
+                if ok:
+                    sustained = level
+                print(f"  {level:>5} conns: {len(samples) / args.duration:8.1f} req/s  p50 {stats['p50']:8.2f} ms  "
+                      f"p99 {stats['p99']:8.2f} ms  errors {errors}{'' if ok else '  (over budget)'}")
+            print(f"  sustained at p99 <= {args.p99_ms:g} ms: {sustained} connections")
+        finally:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
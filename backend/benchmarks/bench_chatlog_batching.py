@@ -0,0 +1,78 @@
+"""
+Benchmark: POST /api/chatbot latency and chat log inserts/second,
+with synchronous insert_one vs the write-behind buffer.
+
+Chat logs go to a local stand-in collection that sleeps --rtt-ms per
+round trip, so the numbers reflect database latency the user no longer waits on.
+
+Usage (from backend/):
+    python benchmarks/bench_chatlog_batching.py [--requests 2000] [--threads 8] [--rtt-ms 2]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from common import make_app, describe
+
+class SlowCollection:
+    """Stand-in chatlogs collection with a fixed per-round-trip delay."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def insert_one(self, doc):
+        time.sleep(self.rtt)
+        with self._lock:
+            self.count += 1
+
+    def insert_many(self, docs, ordered=True):
+        time.sleep(self.rtt)
+        with self._lock:
+            self.count += len(docs)
+
+class StandInDB:
+    def __init__(self, chatlogs):
+        self.chatlogs = chatlogs
+
+def run(app, token, requests, threads):
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    def one(_):
+        start = time.perf_counter()
+        client.post("/api/chatbot", json={"message": "feeling a bit stressed"}, headers=headers)
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        samples = list(pool.map(one, range(requests)))
+    return samples, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = make_app(use_mongomock=True)
+    client = app.test_client()
+    token = client.post("/api/signup", json={"name": "Bench", "email": "chat@example.com", "password": "pw"}).get_json()["token"]
+
+    import chatbot
+    from utils.write_behind import WriteBehindBuffer
+
+    for mode in ("insert_one", "write-behind"):
+        chatlogs = SlowCollection(args.rtt_ms / 1000)
+        chatbot.db = StandInDB(chatlogs)
+        buffer = WriteBehindBuffer(lambda: chatlogs) if mode == "write-behind" else None
+        app.extensions['chatlog_buffer'] = buffer
+        samples, elapsed = run(app, token, args.requests, args.threads)
+        if buffer is not None:
+            buffer.close()
+        print(f"{mode:>12}: latency ms {describe(samples)}, "
+              f"{chatlogs.count / elapsed:,.0f} inserts/s, "
+              f"{chatlogs.count} stored" + (f", flush stats {buffer.stats()}" if buffer else ""))
+
+if __name__ == "__main__":
+    main()
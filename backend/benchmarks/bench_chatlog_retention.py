@@ -0,0 +1,117 @@
+"""
+Benchmark: chat log retention (hot collection + compressed archive segments).
+
+Seeds chat histories spread over --days days, then reports the hot
+collection's document count, data size and index size, and the time to
+stream one user's full history, before and after `compact-chatlogs` moves
+everything older than --hot-days into db.chatlog_archives. Archive read
+throughput is reported for a full read and for a read starting mid-history
+(which only decompresses the blocks it needs).
+
+Sizes come from collStats on a real MongoDB; with --mongomock they are
+estimated from the BSON size of the documents and the number of index keys.
+
+Usage (from backend/):
+    python benchmarks/bench_chatlog_retention.py [--mongomock] [--users 10] [--chats 20000] [--codec gzip|zstd]
+"""
+import argparse
+import datetime
+import random
+import time
+from common import make_app
+from bench_mood_storage import collection_sizes
+
+MESSAGES = [
+    "I'm feeling anxious about tomorrow",
+    "Had a good day today, went for a walk",
+    "Can't sleep again",
+    "Work is really stressful this week",
+    "Thanks, that breathing exercise helped",
+]
+
+def seed(database, user_id, count, days, rng, now):
+    docs = [
+        {
+            "user_id": user_id,
+            "message": rng.choice(MESSAGES),
+            "bot_response": "It sounds like you're going through a lot. Want to try a short breathing exercise?",
+            "timestamp": now - datetime.timedelta(seconds=rng.randint(0, days * 86400)),
+            "mood": rng.choice(["anxious", "calm", "sad", None]),
+        }
+        for _ in range(count)
+    ]
+    for i in range(0, len(docs), 5000):
+        database.chatlogs.insert_many(docs[i:i + 5000])
+
+def read_rate(fn, repeat):
+    """Best-of-repeat chats per second for a generator-returning fn."""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in fn())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, count / best if best else 0.0
+
+def report(label, database, use_mongomock):
+    print(f"{label}:")
+    print(f"  chatlogs:         {collection_sizes(database, 'chatlogs', use_mongomock)}")
+    if "chatlog_archives" in database.list_collection_names():
+        print(f"  chatlog_archives: {collection_sizes(database, 'chatlog_archives', use_mongomock)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--chats", type=int, default=20000, help="Chats per user.")
+    parser.add_argument("--days", type=int, default=365, help="History length.")
+    parser.add_argument("--hot-days", type=int, default=30)
+    parser.add_argument("--segment-size", type=int, default=5000)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument("--codec", default="gzip")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    make_app(use_mongomock=args.mongomock)
+    import database
+    from indexes import ensure_indexes
+    from models.chat_archive import archive_stats, compact_chatlogs, iter_chat_history
+    database_ = database.get_db()
+    users = [f"bench-chat-{i}" for i in range(args.users)]
+    database_.chatlogs.delete_many({"user_id": {"$in": users}})
+    database_.chatlog_archives.delete_many({"user_id": {"$in": users}})
+    ensure_indexes(database_)
+
+    rng = random.Random(11)
+    now = datetime.datetime(2025, 1, 1)
+    for user_id in users:
+        seed(database_, user_id, args.chats, args.days, rng, now)
+
+    user_id = users[0]
+    middle = now - datetime.timedelta(days=args.days // 2)
+    reads = {
+        "full history": lambda: iter_chat_history(user_id),
+        "from mid-history": lambda: iter_chat_history(user_id, start=middle),
+    }
+
+    report("before compaction", database_, args.mongomock)
+    for label, fn in reads.items():
+        count, rate = read_rate(fn, args.repeat)
+        print(f"  read {label:>16}: {count} chats, {rate:12.0f} chats/s")
+
+    start = time.perf_counter()
+    _, archived = compact_chatlogs(args.hot_days, args.segment_size, args.block_size, args.codec, now=now)
+    elapsed = time.perf_counter() - start
+    print(f"compaction: {archived} chats in {elapsed:.2f} s ({archived / elapsed:.0f} chats/s)")
+    stats = archive_stats()
+    ratio = stats["raw_bytes"] / stats["compressed_bytes"] if stats["compressed_bytes"] else 0
+    print(f"  archive: {stats} (NDJSON compression {ratio:.1f}x)")
+
+    report("after compaction", database_, args.mongomock)
+    for label, fn in reads.items():
+        count, rate = read_rate(fn, args.repeat)
+        print(f"  read {label:>16}: {count} chats, {rate:12.0f} chats/s")
+
+if __name__ == "__main__":
+    main()
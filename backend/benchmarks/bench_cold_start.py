@@ -0,0 +1,106 @@
+"""
+Benchmark: cold start of a worker, with and without deferred loading.
+
+Spawns fresh interpreters that run create_app() and serve GET /api/health,
+then a first API request, through the test client. Reports the median time from
+spawn to each, with APP_LAZY_LOAD=true and false, and the largest
+top-level imports seen before /api/health was answered (`python -X importtime`).
+
+Exits with status 1 if the lazy start misses --budget-ms, or if any of
+--forbid was imported before /api/health (the heavy dependencies must stay
+deferred), so it can run in CI.
+
+Usage (from backend/):
+    python benchmarks/bench_cold_start.py [--repeat 7] [--budget-ms 250] [--forbid pymongo,bcrypt,jwt,orjson,numpy]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEALTH_MARKER = "--- /api/health answered ---"
+
+CHILD = f"HEALTH_MARKER = {HEALTH_MARKER!r}\n" + r"""
+import json, sys
+from app import create_app
+app = create_app()
+client = app.test_client()
+status = client.get("/api/health").status_code
+print(json.dumps({"event": "health", "status": status, "modules": sorted(sys.modules)}), flush=True)
+print(HEALTH_MARKER, file=sys.stderr, flush=True)
+status = client.get("/api/moods").status_code  # 401 without a token, after loading everything
+print(json.dumps({"event": "first_request", "status": status}), flush=True)
+"""
+
+def spawn(lazy, importtime=False):
+    """Run one cold start; returns ({event: ms since spawn}, modules at health, importtime stderr)."""
+    env = dict(os.environ, APP_LAZY_LOAD="true" if lazy else "false")
+    env.setdefault("MONGO_URI", "mongodb://127.0.0.1:27017")
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", CHILD]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True)
+    timings = {}
+    modules = []
+    for line in process.stdout:
+        message = json.loads(line)
+        timings[message["event"]] = (time.perf_counter() - started) * 1000
+        modules = message.get("modules", modules)
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise SystemExit(f"child failed:\n{stderr}")
+    return timings, modules, stderr
+
+def top_imports(stderr, limit):
+    """Largest top-level imports (cumulative microseconds) from -X importtime output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  ") and name.strip() and cumulative.strip().isdigit():
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Lazy spawn -> /api/health budget.")
+    parser.add_argument("--forbid", default="pymongo,bcrypt,jwt,orjson,numpy",
+                        help="Modules that must not be imported before /api/health.")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    spawn(True)  # Warm the bytecode cache so every run starts the same way
+    results = {}
+    for lazy in (False, True):
+        runs = [spawn(lazy)[0] for _ in range(args.repeat)]
+        results[lazy] = {event: statistics.median(run[event] for run in runs) for event in runs[0]}
+        label = "lazy " if lazy else "eager"
+        print(f"{label}: /api/health after {results[lazy]['health']:7.1f} ms, "
+              f"first API request after {results[lazy]['first_request']:7.1f} ms (median of {args.repeat})")
+
+    _, modules, stderr = spawn(True, importtime=True)
+    print("largest imports before /api/health (lazy):")
+    for cumulative, name in top_imports(stderr.split(HEALTH_MARKER)[0], args.top):
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    failures = []
+    forbidden = [name for name in args.forbid.split(",") if name and name in modules]
+    if forbidden:
+        failures.append(f"imported before /api/health: {', '.join(forbidden)}")
+    if results[True]["health"] > args.budget_ms:
+        failures.append(f"lazy cold start {results[True]['health']:.1f} ms > budget {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"ok: within the {args.budget_ms:.0f} ms budget")
+
+if __name__ == "__main__":
+    main()
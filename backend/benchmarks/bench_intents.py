@@ -0,0 +1,56 @@
+"""
+Benchmark: per-message cost of the chatbot intent matcher as the rule table grows.
+
+Compiles synthetic rule tables of increasing size and times matching short
+and long messages; the cost per message should stay roughly flat.
+
+Usage (from backend/):
+    python benchmarks/bench_intents.py [--sizes 10,100,1000,10000] [--repeat 200]
+"""
+import argparse
+import random
+import string
+import time
+import common  # noqa: F401  (puts backend/ on sys.path)
+from utils.intents import CompiledRules
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+def make_rules(count, rng):
+    return [
+        {
+            "name": f"rule{i}",
+            "priority": rng.randint(0, 100),
+            "keywords": [random_word(rng) + ("*" if rng.random() < 0.1 else "") for _ in range(3)],
+            "response": f"response {i}",
+        }
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = {
+        "short (80 chars)": " ".join(random_word(rng) for _ in range(10))[:80],
+        "long (10k chars)": " ".join(random_word(rng) for _ in range(1300))[:10000],
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        start = time.perf_counter()
+        compiled = CompiledRules(make_rules(size, rng))
+        compile_ms = (time.perf_counter() - start) * 1000
+        timings = []
+        for label, message in messages.items():
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                compiled.respond(message)
+            per_message = (time.perf_counter() - start) / args.repeat * 1e6
+            timings.append(f"{label}: {per_message:9.1f} us")
+        print(f"{size:>6} rules (compile {compile_ms:7.1f} ms) | " + " | ".join(timings))
+
+if __name__ == "__main__":
+    main()
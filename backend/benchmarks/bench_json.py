@@ -0,0 +1,96 @@
+"""
+Benchmark: JSON encoding of typical API payloads, old path vs FastJSONProvider.
+
+"old" converts ObjectId/datetime fields by hand and encodes with Flask's default
+provider (as the views used to); "new" hands the raw documents to FastJSONProvider.
+Payloads: a page of 1,000 mood entries and a resources catalog.
+
+Usage (from backend/):
+    python benchmarks/bench_json.py [--moods 1000] [--resources 500] [--repeat 200]
+"""
+import argparse
+import datetime
+import random
+import time
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import common  # noqa: F401  (puts backend/ on sys.path)
+from utils.json_provider import FastJSONProvider, orjson
+
+MOODS = ["happy", "calm", "sad", "anxious", "stressed", "tired"]
+TOPICS = ["stress", "sleep", "anxiety", "breathing", "relaxation", "mindfulness"]
+
+def make_moods(count, rng):
+    user_id = str(ObjectId())
+    now = datetime.datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "mood": rng.choice(MOODS),
+            "note": "Felt a little better after a walk." if rng.random() < 0.3 else "",
+            "timestamp": now - datetime.timedelta(minutes=i * 37),
+        }
+        for i in range(count)
+    ]
+
+def make_resources(count, rng):
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"{rng.choice(TOPICS).title()} guide {i}",
+            "summary": "Simple exercises to help you relax and recover.",
+            "content": "Step 1: notice your breathing. Step 2: slow it down. " * 10,
+            "topics": rng.sample(TOPICS, 2),
+        }
+        for i in range(count)
+    ]
+
+def old_moods(moods):
+    mood_list = []
+    for mood in moods:
+        mood = dict(mood, _id=str(mood["_id"]))
+        mood["timestamp"] = mood["timestamp"].isoformat()
+        mood_list.append(mood)
+    return {"moods": mood_list}
+
+def old_resources(resources):
+    return {"resources": [dict(res, _id=str(res["_id"])) for res in resources]}
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(fn())
+    return (time.perf_counter() - start) / repeat * 1000, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--moods", type=int, default=1000)
+    parser.add_argument("--resources", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    moods = make_moods(args.moods, rng)
+    resources = make_resources(args.resources, rng)
+
+    old_app, new_app = Flask("old"), Flask("new")
+    old_app.json = DefaultJSONProvider(old_app)
+    new_app.json = FastJSONProvider(new_app)
+
+    print(f"encoder: {'orjson' if orjson else 'stdlib json (orjson not installed)'}")
+    cases = [
+        (f"{args.moods} moods", lambda: old_moods(moods), lambda: {"moods": moods}),
+        (f"{args.resources} resources", lambda: old_resources(resources), lambda: {"resources": resources}),
+    ]
+    for label, old_payload, new_payload in cases:
+        with old_app.app_context():
+            old_ms, old_size = timed(lambda: old_app.json.response(old_payload()).get_data(), args.repeat)
+        with new_app.app_context():
+            new_ms, new_size = timed(lambda: new_app.json.response(new_payload()).get_data(), args.repeat)
+        print(f"{label:>16}: old {old_ms:7.3f} ms ({old_size} B) | new {new_ms:7.3f} ms ({new_size} B) | "
+              f"{old_ms / new_ms:4.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Load benchmark: latency of /api/health and /api/moods during a login storm.
+
+Measures p50/p95/p99 of the light endpoints on their own, then again while
+--storm threads hammer /api/login. With the bcrypt pool the light endpoints
+should stay flat and excess logins get fast 503s.
+
+Usage (from backend/):
+    python benchmarks/bench_login_storm.py --mongomock [--storm 32] [--seconds 5]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+from common import make_app, serve, call, describe
+
+def measure(base_url, token, seconds):
+    samples = {"/api/health": [], "/api/moods": []}
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        for path, bucket in samples.items():
+            _, elapsed, _ = call(base_url, "GET", path, token=token)
+            bucket.append(elapsed)
+    return {path: describe(bucket) for path, bucket in samples.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--storm", type=int, default=32, help="Concurrent login threads.")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    app = make_app(use_mongomock=args.mongomock)
+    base_url, server = serve(app)
+    credentials = {"name": "Bench", "email": "storm@example.com", "password": "correct horse"}
+    status, _, body = call(base_url, "POST", "/api/signup", credentials)
+    if status == 409:
+        status, _, body = call(base_url, "POST", "/api/login", credentials)
+    token = body["token"]
+    call(base_url, "POST", "/api/mood", {"mood": "happy"}, token=token)
+
+    print("baseline:", measure(base_url, token, args.seconds))
+
+    stop = threading.Event()
+    statuses = Counter()
+    def storm():
+        while not stop.is_set():
+            status, _, _ = call(base_url, "POST", "/api/login", credentials)
+            statuses[status] += 1
+    threads = [threading.Thread(target=storm, daemon=True) for _ in range(args.storm)]
+    for thread in threads:
+        thread.start()
+    print("during login storm:", measure(base_url, token, args.seconds))
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print("login responses:", dict(statuses))
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: population mood analytics (`flask analytics mood-trends`).
+
+Reports wall time and peak memory of the vectorized job on synthetic mood
+rows (10M by default), split into loading (lists -> NumPy columns) and the
+aggregates. The rows come from a generator shaped like a mood store's
+scan_columns() batches, so the figures exclude MongoDB; pass --database to
+run the whole job against MONGO_URI instead (--seed writes the rows first).
+
+--compare-python N also runs a plain dict/Counter version of the daily
+distribution and streak histogram on the first N rows and checks that both
+give the same answer.
+
+Usage (from backend/):
+    python benchmarks/bench_mood_analytics.py [--rows 10000000] [--users 50000] [--compare-python 200000]
+    python benchmarks/bench_mood_analytics.py --database --seed --rows 1000000
+"""
+import argparse
+import collections
+import datetime
+import resource
+import time
+import numpy as np
+from common import make_app
+
+MOODS = ["happy", "calm", "sad", "anxious", "stressed", "tired"]
+NOW = datetime.datetime(2025, 1, 1)
+
+class SyntheticMoods:
+    """scan_columns() over generated rows: users log a few moods a day over their last year."""
+
+    def __init__(self, rows, users, seed=5):
+        self.rows = rows
+        self.user_ids = [f"{i:024x}" for i in range(users)]
+        self.seed = seed
+
+    def scan_columns(self, batch_size=100000):
+        rng = np.random.default_rng(self.seed)
+        base = np.datetime64(NOW, "s")
+        for start in range(0, self.rows, batch_size):
+            size = min(batch_size, self.rows - start)
+            users = rng.zipf(1.3, size) % len(self.user_ids)
+            seconds = rng.integers(0, 365 * 86400, size)
+            timestamps = (base - seconds.astype("timedelta64[s]")).astype(object).tolist()
+            yield ([self.user_ids[u] for u in users.tolist()],
+                   [MOODS[m] for m in rng.integers(0, len(MOODS), size).tolist()],
+                   timestamps)
+
+def signups(user_ids, seed=6):
+    rng = np.random.default_rng(seed)
+    days = (NOW.date() - datetime.date(1970, 1, 1)).days - rng.integers(0, 400, len(user_ids))
+    return days.astype(np.int32)
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def python_reference(source, limit, batch_size):
+    """Daily counts and streak histogram with dicts and loops, for the first `limit` rows."""
+    daily = collections.defaultdict(collections.Counter)
+    days_by_user = collections.defaultdict(set)
+    seen = 0
+    for user_ids, moods, timestamps in source.scan_columns(batch_size):
+        for user_id, mood, timestamp in zip(user_ids, moods, timestamps):
+            day = timestamp.date()
+            daily[day][mood] += 1
+            days_by_user[user_id].add(day)
+            seen += 1
+            if seen >= limit:
+                break
+        if seen >= limit:
+            break
+    runs = collections.Counter()
+    for days in days_by_user.values():
+        run = 0
+        previous = None
+        for day in sorted(days):
+            if previous is not None and (day - previous).days == 1:
+                run += 1
+            else:
+                if run:
+                    runs[run] += 1
+                run = 1
+            previous = day
+        runs[run] += 1
+    return daily, runs
+
+class Limited:
+    def __init__(self, source, limit):
+        self.source = source
+        self.limit = limit
+
+    def scan_columns(self, batch_size=100000):
+        left = self.limit
+        for user_ids, moods, timestamps in self.source.scan_columns(batch_size):
+            if left <= 0:
+                return
+            yield user_ids[:left], moods[:left], timestamps[:left]
+            left -= len(user_ids)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--compare-python", type=int, default=0, metavar="N")
+    parser.add_argument("--database", action="store_true", help="Run the whole job against MONGO_URI.")
+    parser.add_argument("--seed", action="store_true", help="With --database: insert the synthetic rows first.")
+    args = parser.parse_args()
+
+    make_app()
+    from models import analytics
+    source = SyntheticMoods(args.rows, args.users)
+    baseline = peak_rss_mb()
+
+    if args.database:
+        from models.mood_store import get_mood_store
+        if args.seed:
+            store = get_mood_store()
+            for user_ids, moods, timestamps in source.scan_columns(10_000):
+                store.insert_many([
+                    {"user_id": u, "mood": m, "timestamp": t, "note": ""}
+                    for u, m, t in zip(user_ids, moods, timestamps)
+                ])
+        start = time.perf_counter()
+        report = analytics.run_mood_trends(args.batch_size, args.weeks, now=NOW)
+        print(f"job: {report['entries']} rows, {report['users']} users in {time.perf_counter() - start:.2f} s, "
+              f"peak RSS +{peak_rss_mb() - baseline:.0f} MB")
+        return
+
+    start = time.perf_counter()
+    user, mood, day, users, moods = analytics.load_mood_columns(source, args.batch_size)
+    loaded = time.perf_counter()
+    load_rss = peak_rss_mb() - baseline
+    user_signup = signups(users.keys())
+    report = analytics.compute_mood_trends(user, mood, day, moods.keys(), user_signup, user_signup, args.weeks, NOW)
+    done = time.perf_counter()
+    print(f"rows: {report['entries']}, users: {report['users']}, days: {len(report['daily'])}, "
+          f"cohorts: {len(report['retention'])}")
+    print(f"load (lists -> columns): {loaded - start:8.2f} s   peak RSS +{load_rss:.0f} MB")
+    print(f"aggregates:              {done - loaded:8.2f} s   peak RSS +{peak_rss_mb() - baseline:.0f} MB")
+    print(f"columns: {(user.nbytes + mood.nbytes + day.nbytes) / 2**20:.0f} MB "
+          f"({(user.nbytes + mood.nbytes + day.nbytes) / max(1, len(day)):.0f} bytes/row)")
+
+    if args.compare_python:
+        limited = Limited(source, args.compare_python)
+        start = time.perf_counter()
+        daily, runs = python_reference(limited, args.compare_python, args.batch_size)
+        python_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        user, mood, day, users, moods = analytics.load_mood_columns(limited, args.batch_size)
+        small = analytics.compute_mood_trends(user, mood, day, moods.keys(), signups(users.keys()),
+                                              signups(users.keys()), args.weeks, NOW)
+        numpy_seconds = time.perf_counter() - start
+        same = (
+            {row["date"]: row["counts"] for row in small["daily"]}
+            == {d.isoformat(): dict(c) for d, c in daily.items()}
+            and {row["length"]: row["streaks"] for row in small["streaks"]["histogram"]} == dict(runs)
+        )
+        print(f"first {args.compare_python} rows: python {python_seconds:.2f} s, numpy {numpy_seconds:.2f} s "
+              f"(including list conversion), same result: {same}")
+
+if __name__ == "__main__":
+    main()
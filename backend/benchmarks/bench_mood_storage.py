@@ -0,0 +1,101 @@
+"""
+Benchmark: mood storage engines ("documents" vs "buckets") on long histories.
+
+Writes the same synthetic histories through both engines, then compares
+storage size, index size and read latency for a GET /api/moods page, a deep
+page (cursor near the start of the history), the pipeline dashboard summary
+and a full history scan (export / summary rebuild).
+
+Sizes come from collStats on a real MongoDB; with --mongomock they are
+estimated from the BSON size of the documents and the number of index keys.
+
+Usage (from backend/):
+    python benchmarks/bench_mood_storage.py [--mongomock] [--users 5] [--moods 20000] [--repeat 20]
+"""
+import argparse
+import datetime
+import random
+import time
+import bson
+from common import make_app, describe
+
+MOODS = ["happy", "calm", "sad", "anxious", "stressed", "tired"]
+
+def history(user_id, count, rng):
+    now = datetime.datetime(2025, 1, 1)
+    return [
+        {
+            "user_id": user_id,
+            "mood": rng.choice(MOODS),
+            "timestamp": now - datetime.timedelta(minutes=rng.randint(0, 3 * 365 * 1440)),
+            "note": "Felt a little better after a walk." if rng.random() < 0.2 else "",
+        }
+        for _ in range(count)
+    ]
+
+def collection_sizes(database, name, use_mongomock):
+    if not use_mongomock:
+        stats = database.command("collStats", name)
+        return {"documents": stats["count"], "data_bytes": stats["size"],
+                "storage_bytes": stats.get("storageSize"), "index_bytes": stats["totalIndexSize"]}
+    docs = list(database[name].find())
+    index_keys = len(docs) * len(database[name].index_information())
+    return {"documents": len(docs), "data_bytes": sum(len(bson.encode(doc)) for doc in docs),
+            "storage_bytes": None, "index_keys": index_keys}
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return describe(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--moods", type=int, default=20000, help="Entries per user.")
+    parser.add_argument("--bucket-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app(use_mongomock=args.mongomock)
+    import database
+    from indexes import ensure_indexes
+    from models.mood_store import make_mood_store, set_mood_store
+    from models.mood import pipeline_summary
+    database_ = database.get_db()
+    ensure_indexes(database_)
+
+    rng = random.Random(7)
+    users = [f"bench-storage-{i}" for i in range(args.users)]
+    stores = {name: make_mood_store(name, args.bucket_size) for name in ("documents", "buckets")}
+    for store in stores.values():
+        for user_id in users:
+            store.delete_user(user_id)
+    for user_id in users:
+        entries = history(user_id, args.moods, rng)
+        for store in stores.values():
+            for i in range(0, len(entries), 1000):
+                # Each engine gets its own copies (inserts set _id in place)
+                store.insert_many([dict(entry) for entry in entries[i:i + 1000]])
+
+    with app.app_context():
+        for name, store in stores.items():
+            set_mood_store(store)
+            print(f"{name}: {collection_sizes(database_, store.collection, args.mongomock)}")
+            user_id = users[0]
+            oldest = next(store.iter_user(user_id))
+            deep_cursor = (oldest["timestamp"] + datetime.timedelta(days=30), oldest["_id"])
+            results = {
+                "page (30)": timed(lambda: store.page(user_id, 31), args.repeat),
+                "deep page (30)": timed(lambda: store.page(user_id, 31, before=deep_cursor), args.repeat),
+                "pipeline summary": timed(lambda: pipeline_summary(user_id), max(1, args.repeat // 4)),
+                "full scan": timed(lambda: sum(1 for _ in store.iter_user(user_id)), max(1, args.repeat // 4)),
+            }
+            for label, stats in results.items():
+                print(f"  {label:>18}: p50 {stats['p50']:9.2f} ms  p95 {stats['p95']:9.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: ?q= search latency over a synthetic resources catalog.
+
+Builds the in-process inverted index over --articles generated articles
+(Zipf-distributed vocabulary) and times full-word, multi-word and
+type-ahead prefix queries, plus incremental inserts.
+
+Usage (from backend/):
+    python benchmarks/bench_resource_search.py [--articles 50000] [--queries 500]
+"""
+import argparse
+import itertools
+import random
+import string
+import time
+import common  # noqa: F401  (puts backend/ on sys.path)
+from models.resource import SEARCH_FIELDS
+from utils.search import InvertedIndex
+
+def make_vocabulary(rng, size):
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(size)]
+
+def make_article(rng, vocabulary, cum_weights, i):
+    words = lambda n: " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=n))
+    return {
+        "_id": str(i),
+        "title": words(6),
+        "summary": words(20),
+        "content": words(150),
+        "topics": rng.choices(vocabulary[:50], k=3),
+    }
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    articles = [make_article(rng, vocabulary, cum_weights, i) for i in range(args.articles)]
+
+    index = InvertedIndex(SEARCH_FIELDS)
+    start = time.perf_counter()
+    for article in articles:
+        index.add(article["_id"], article)
+    build = time.perf_counter() - start
+    print(f"indexed {args.articles:,} articles in {build:.1f}s "
+          f"({build / args.articles * 1e6:.0f} us/insert), {len(index.terms):,} terms")
+
+    # Queries use mid-frequency words, as real searches for specific topics would
+    mid = vocabulary[200:5000]
+    queries = {
+        "one word": lambda: index.search(rng.choice(mid), prefix=False),
+        "two words": lambda: index.search(f"{rng.choice(mid)} {rng.choice(mid)}", prefix=False),
+        "type-ahead prefix": lambda: index.search(rng.choice(mid)[:4]),
+        "common word": lambda: index.search(rng.choice(vocabulary[:20]), prefix=False),
+    }
+    for label, query in queries.items():
+        print(f"{label:>18}: {timed(query, args.queries):8.3f} ms/query")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: GET /api/resources requests/second with the catalog cache off and on,
+plus conditional requests answered with 304 Not Modified.
+
+Usage (from backend/):
+    python benchmarks/bench_resources_cache.py [--mongomock] [--resources 200] [--requests 2000]
+"""
+import argparse
+import time
+from common import make_app
+
+TOPICS = ["stress", "sleep", "anxiety", "breathing", "relaxation"]
+
+def rate(client, requests, headers=None, path="/api/resources"):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers or {})
+    return requests / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = make_app(use_mongomock=args.mongomock)
+    client = app.test_client()
+    for i in range(args.resources):
+        client.post("/api/resources", json={
+            "title": f"Article {i}", "summary": "A short summary. " * 3,
+            "content": "Step 1: breathe in. Step 2: breathe out. " * 20,
+            "topics": [TOPICS[i % len(TOPICS)], TOPICS[(i + 2) % len(TOPICS)]],
+        })
+
+    app.config['RESOURCES_CACHE'] = False
+    print(f"cache off:         {rate(client, args.requests):9,.0f} req/s")
+    app.config['RESOURCES_CACHE'] = True
+    print(f"cache on:          {rate(client, args.requests):9,.0f} req/s")
+    etag = client.get("/api/resources").headers["ETag"]
+    print(f"cache on, 304s:    {rate(client, args.requests, {'If-None-Match': etag}):9,.0f} req/s")
+    print(f"cache on, ?topic=: {rate(client, args.requests, path='/api/resources?topic=stress'):9,.0f} req/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Shared helpers for the scripts in benchmarks/ (run them from backend/)."""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+def make_app(use_mongomock=False, admission=False, **config):
+    """
+    Build the Flask app against MONGO_URI, or against an in-memory
+    mongomock database when use_mongomock is set.
+    Admission control is off unless `admission` is set: benchmarks drive far
+    more traffic per user and IP than the production limits allow.
+    """
+    # Read by create_app() (which may load eagerly), so set before building the app
+    os.environ["ADMISSION_ENABLED"] = "true" if admission else "false"
+    if use_mongomock:
+        import mongomock
+        import database
+        database.set_client_factory(lambda uri, **options: mongomock.MongoClient())
+    from app import create_app
+    from utils.startup import ensure_loaded
+    app = create_app()
+    app.config.update(config)
+    # Benchmarks use extensions outside requests; finish the deferred setup now
+    return ensure_loaded(app)
+
+def serve(app):
+    """Run the app on a threaded local server; returns (base_url, server)."""
+    from werkzeug.serving import make_server
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+def call(base_url, method, path, body=None, token=None):
+    """Issue one HTTP request; returns (status, elapsed_seconds, json_or_None)."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method)
+    request.add_header("Content-Type", "application/json")
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            payload = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        payload = e.read()
+        status = e.code
+    elapsed = time.perf_counter() - start
+    try:
+        return status, elapsed, json.loads(payload)
+    except ValueError:
+        return status, elapsed, None
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def describe(samples):
+    """p50/p95/p99 in milliseconds."""
+    return {f"p{p}": round(percentile(samples, p) * 1000, 3) for p in (50, 95, 99)}
@@ -0,0 +1,247 @@
+"""
+Reproducible load test covering every blueprint.
+
+Seeds MongoDB (MONGO_URI, or an in-memory mongomock stand-in with --mongomock)
+with synthetic users, mood histories, chat logs and a resources catalog, then
+drives the app through scripted user journeys at the requested concurrency:
+
+    login -> log mood -> poll dashboard -> page moods -> chat -> browse/search resources
+
+Reports throughput, p50/p95/p99 latency per step and MongoDB operations per
+request, and writes the results as JSON so runs can be diffed between commits.
+
+Usage (from backend/):
+    python benchmarks/loadtest.py --mongomock --users 20 --concurrency 8 --output results.json
+    python benchmarks/loadtest.py --mongomock --compare results.json   # diff against an earlier run
+    python benchmarks/loadtest.py --base-url http://localhost:5000      # an already running server
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import monitoring
+from common import make_app, serve, call, describe
+
+MOODS = ["happy", "calm", "sad", "anxious", "stressed", "tired"]
+TOPICS = ["stress", "sleep", "anxiety", "breathing", "relaxation", "mindfulness"]
+MESSAGES = ["hi", "I feel anxious today", "so stressed about work", "any tips?", "feeling down", "nothing much"]
+PASSWORD = "load-test-password"
+
+# ==== Seeding ====
+def seed(database, args, rng):
+    """Insert users with 10..--max-moods mood entries (log-uniform), chats and resources."""
+    import bcrypt
+    from models.mood_store import get_mood_store
+    hashed = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=args.bcrypt_rounds))
+    now = datetime.datetime.utcnow()
+    emails = []
+    for i in range(args.users):
+        email = f"load{i}@example.com"
+        user_id = str(database.users.insert_one({
+            "name": f"Load {i}", "email": email, "password": hashed, "created_at": now,
+        }).inserted_id)
+        emails.append(email)
+        count = int(math.exp(rng.uniform(math.log(10), math.log(args.max_moods))))
+        span = max(count // 2, 1)  # roughly two entries per active day
+        # Through the configured engine, so MOODS_STORAGE=buckets runs are seeded the same way
+        get_mood_store().insert_many([
+            {
+                "user_id": user_id,
+                "mood": rng.choice(MOODS),
+                "timestamp": now - datetime.timedelta(days=rng.randint(0, span), minutes=rng.randint(0, 1440)),
+                "note": "",
+            }
+            for _ in range(count)
+        ])
+        database.chatlogs.insert_many([
+            {
+                "user_id": user_id,
+                "message": rng.choice(MESSAGES),
+                "bot_response": "...",
+                "timestamp": now - datetime.timedelta(minutes=rng.randint(0, span * 1440)),
+                "mood": None,
+            }
+            for _ in range(count // 2 + 1)
+        ])
+    database.resources.insert_many([
+        {
+            "title": f"{rng.choice(TOPICS).title()} guide {i}",
+            "summary": "Simple exercises to help you relax and recover.",
+            "content": "Step 1: notice your breathing. Step 2: slow it down. " * 10,
+            "topics": rng.sample(TOPICS, 2),
+        }
+        for i in range(args.resources)
+    ])
+    return emails
+
+# ==== Journeys ====
+def journey(base_url, email, iterations, rng, record):
+    status, elapsed, body = call(base_url, "POST", "/api/login", {"email": email, "password": PASSWORD})
+    record("login", status, elapsed)
+    if status != 200:
+        return
+    token = body["token"]
+    steps = [
+        ("log mood", lambda: call(base_url, "POST", "/api/mood", {"mood": rng.choice(MOODS)}, token)),
+        ("dashboard", lambda: call(base_url, "GET", "/api/dashboard", token=token)),
+        ("moods page", lambda: call(base_url, "GET", "/api/moods?limit=30", token=token)),
+        ("chat", lambda: call(base_url, "POST", "/api/chatbot", {"message": rng.choice(MESSAGES)}, token)),
+        ("resources", lambda: call(base_url, "GET", "/api/resources")),
+        ("resources by topic", lambda: call(base_url, "GET", f"/api/resources?topic={rng.choice(TOPICS)}")),
+        ("resources search", lambda: call(base_url, "GET", f"/api/resources?q={rng.choice(TOPICS)[:4]}")),
+        ("profile", lambda: call(base_url, "GET", "/api/profile", token=token)),
+        ("settings", lambda: call(base_url, "GET", "/api/settings", token=token)),
+    ]
+    for _ in range(iterations):
+        for name, step in steps:
+            status, elapsed, _ = step()
+            record(name, status, elapsed)
+
+# ==== Mongo operation counting ====
+class CommandCounter(monitoring.CommandListener):
+    """Counts every command sent to the server."""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def count_mongomock_ops():
+    """mongomock emits no command events; count collection method calls instead."""
+    import mongomock
+    counter = CommandCounter()
+    nested = threading.local()
+    for name in ("find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+                 "delete_one", "delete_many", "aggregate", "distinct", "count_documents",
+                 "find_one_and_update", "bulk_write"):
+        original = getattr(mongomock.Collection, name)
+        def counted(self, *args, _original=original, **kwargs):
+            # Only count the outermost call (find_one calls find internally, etc.)
+            if getattr(nested, "depth", 0) == 0:
+                counter.count += 1
+            nested.depth = getattr(nested, "depth", 0) + 1
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                nested.depth -= 1
+        setattr(mongomock.Collection, name, counted)
+    return counter
+
+# ==== Reporting ====
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous):
+    print(f"\nvs {previous.get('revision')} ({previous.get('started_at')}):")
+    for name, stats in current["steps"].items():
+        before = previous["steps"].get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ("p50", "p95", "p99"):
+            if before[key]:
+                changes.append(f"{key} {100 * (stats[key] - before[key]) / before[key]:+6.1f}%")
+        print(f"  {name:>20}: " + "  ".join(changes))
+    if previous.get("throughput_rps"):
+        change = 100 * (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"]
+        print(f"  {'throughput':>20}: {change:+6.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory stand-in for MongoDB.")
+    parser.add_argument("--base-url", help="Drive an already running server instead of an in-process one.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--max-moods", type=int, default=10000)
+    parser.add_argument("--resources", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=10, help="Journey loops per user.")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-seed", action="store_true", help="Reuse data from a previous run.")
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Print changes against an earlier results file.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ops = None
+    if args.base_url:
+        base_url, server = args.base_url, None
+        if args.no_seed:
+            emails = [f"load{i}@example.com" for i in range(args.users)]
+        else:
+            import database
+            emails = seed(database.get_db(), args, rng)
+    else:
+        import database
+        if args.mongomock:
+            ops = count_mongomock_ops()
+        else:
+            ops = CommandCounter()
+            database.add_event_listener(ops)
+        app = make_app(use_mongomock=args.mongomock, BCRYPT_ROUNDS=args.bcrypt_rounds)
+        emails = [f"load{i}@example.com" for i in range(args.users)] if args.no_seed else seed(database.get_db(), args, rng)
+        base_url, server = serve(app)
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    def record(step, status, elapsed):
+        with lock:
+            samples[step].append(elapsed)
+            if status >= 400:
+                errors[step] += 1
+
+    ops_before = ops.count if ops else 0
+    started_at = datetime.datetime.utcnow().isoformat()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for i, email in enumerate(emails):
+            pool.submit(journey, base_url, email, args.iterations, random.Random(args.seed + i), record)
+    elapsed = time.perf_counter() - start
+    total_requests = sum(len(bucket) for bucket in samples.values())
+    if server is not None:
+        server.shutdown()
+
+    results = {
+        "revision": git_revision(),
+        "started_at": started_at,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "requests": total_requests,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total_requests / elapsed, 1),
+        "mongo_ops_per_request": round((ops.count - ops_before) / total_requests, 2) if ops and total_requests else None,
+        "steps": {
+            name: dict(describe(bucket), count=len(bucket), errors=errors[name])
+            for name, bucket in samples.items()
+        },
+    }
+    print(f"{total_requests} requests in {elapsed:.1f}s: {results['throughput_rps']} req/s, "
+          f"{results['mongo_ops_per_request']} Mongo ops/request")
+    for name, stats in results["steps"].items():
+        print(f"  {name:>20}: p50 {stats['p50']:8.2f} ms  p95 {stats['p95']:8.2f} ms  "
+              f"p99 {stats['p99']:8.2f} ms  ({stats['count']} reqs, {stats['errors']} errors)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,20 @@
 from flask import Blueprint, request, jsonify, current_app
 from database import db
-import jwt
+from utils.auth import require_auth
+from utils.intents import get_intent_engine
+from export import EXPORT_FIELDS, export_response
+from models.chat_archive import archive_stats, check_codec, compact_chatlogs, iter_chat_history
+from models.mood import to_datetime
+import click
 import datetime
 
 chatbot_bp = Blueprint('chatbot', __name__)
 
-# ==== Helper: JWT Auth Decorator ====
-def require_auth(f):
-    from functools import wraps
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            parts = request.headers['Authorization'].split()
-            if len(parts) == 2 and parts[0] == "Bearer":
-                token = parts[1]
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            request.user_id = data['user_id']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired.'}), 401
-        except Exception:
-            return jsonify({'error': 'Token is invalid.'}), 401
-        return f(*args, **kwargs)
-    return decorated
-
-# === Sample response logic for MVP ===
+# === Response logic ===
 def basic_bot_response(message, mood=None):
-    message = message.lower()
-    # Simple intent-based rules (expand to ML or retrieval model later)
-    if "hello" in message or "hi" in message:
-        return "Hello! How are you feeling today?"
-    elif "sad" in message or "down" in message:
-        return "I'm sorry you're feeling this way. Would you like to talk about it or try some relaxation techniques?"
-    elif "anxious" in message or "anxiety" in message:
-        return "Anxiety can be overwhelming. Want to try a guided breathing exercise?"
-    elif "stress" in message:
-        return "Managing stress is important. Try taking deep breaths or taking a short walk if you can."
-    elif "tips" in message or "help" in message:
-        return "Here are some tips: 1) Talk to someone you trust. 2) Take breaks. 3) Try mindfulness exercises."
-    elif "hopeless" in message or "suicide" in message:
-        return "If you're struggling, please reach out to a professional or helpline. You're not alone."
-    else:
-        return "I'm here to listen. Tell me more about what's on your mind."
+    # Rule-based intents from data/intents.json (or CHATBOT_INTENTS_SOURCE),
+    # compiled into a single matcher and hot-reloaded when the rules change
+    return get_intent_engine().respond(message, mood)
 
 # ==== Endpoints ====
 
@@ -74,11 +44,59 @@ def chatbot_reply():
     bot_response = basic_bot_response(message, mood)
     chat_entry["bot_response"] = bot_response
 
-    # Save chat log (optional, but useful for analytics and mood trends)
-    db.chatlogs.insert_one(chat_entry)
+    # Save chat log (optional, but useful for analytics and mood trends).
+    # Buffered and written in batches in the background unless disabled.
+    buffer = current_app.extensions.get('chatlog_buffer')
+    if buffer is not None:
+        buffer.put(chat_entry)
+    else:
+        db.chatlogs.insert_one(chat_entry)
 
     return jsonify({"response": bot_response}), 200
 
+# GET /api/chatbot/history?from=...&to=...&format=ndjson|csv
+@chatbot_bp.route('/chatbot/history', methods=['GET'])
+@require_auth
+def chat_history():
+    """Streams the user's chats oldest first, archived history included."""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv."}), 400
+    try:
+        # Naive UTC like the stored timestamps; archived chats are compared in Python
+        start = to_datetime(request.args["from"]) if request.args.get("from") else None
+        end = to_datetime(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "from/to must be ISO timestamps."}), 400
+    docs = iter_chat_history(request.user_id, start, end, current_app.config.get('EXPORT_BATCH_SIZE', 1000),
+                             fields=EXPORT_FIELDS["chatlogs"])
+    return export_response("chatlogs", request.user_id, fmt, docs=docs)
+
+# ==== CLI ====
+
+# flask chatbot compact-chatlogs [--user-id ID] [--hot-days N]
+# Run periodically (cron, a k8s CronJob) to keep db.chatlogs at CHATLOG_HOT_DAYS of history.
+@chatbot_bp.cli.command('compact-chatlogs')
+@click.option('--user-id', default=None, help="Only compact this user's chats.")
+@click.option('--hot-days', type=int, default=None, help="Override CHATLOG_HOT_DAYS.")
+def compact_chatlogs_command(user_id, hot_days):
+    """Move chats older than CHATLOG_HOT_DAYS into compressed archive segments."""
+    config = current_app.config
+    try:
+        codec = check_codec(config.get('CHATLOG_ARCHIVE_CODEC', 'gzip'))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    users, archived = compact_chatlogs(
+        hot_days if hot_days is not None else config.get('CHATLOG_HOT_DAYS', 30),
+        segment_size=config.get('CHATLOG_SEGMENT_SIZE', 5000),
+        block_size=config.get('CHATLOG_ARCHIVE_BLOCK_SIZE', 256),
+        codec=codec,
+        user_id=user_id,
+    )
+    click.echo(f"Archived {archived} chats for {users} users.")
+    click.echo(f"Archive: {archive_stats(user_id)}")
+
 # ==== Example Usage ====
 # POST /api/chatbot with JSON: { "message": "I'm feeling anxious", "mood": "anxious" }
 # Requires Authorization: Bearer <token> in headers
+# GET /api/chatbot/history?from=2024-01-01T00:00:00 streams NDJSON, one chat per line
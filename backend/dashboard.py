@@ -1,32 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
-from database import db
-import jwt
-import datetime
+from utils.auth import require_auth
+from models.mood import compute_summary, rebuild_summary, dashboard_payload, check_summary
+from models.mood_store import get_mood_store
+import click
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
-# ==== Helper: JWT Auth Decorator ====
-def require_auth(f):
-    from functools import wraps
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            parts = request.headers['Authorization'].split()
-            if len(parts) == 2 and parts[0] == "Bearer":
-                token = parts[1]
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            request.user_id = data['user_id']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired.'}), 401
-        except Exception:
-            return jsonify({'error': 'Token is invalid.'}), 401
-        return f(*args, **kwargs)
-    return decorated
-
 # ==== Dashboard Endpoint ====
 
 # GET /api/dashboard
@@ -35,56 +14,50 @@ def require_auth(f):
 def get_dashboard():
     user_id = request.user_id
 
-    # === Aggregate moods ===
-    moods_cursor = db.moods.find({"user_id": user_id}).sort("timestamp", 1)
-    moods = list(moods_cursor)
-    total_moods = len(moods)
-
-    # Mood count by type
-    mood_counts = {}
-    streak = 0
-    longest_streak = 0
-    prev_day = None
-    active_days = set()
-
-    # Calculate mood trend (by day) and streaks
-    mood_trend = []
-    for mood in moods:
-        date = mood["timestamp"].date() if isinstance(mood["timestamp"], datetime.datetime) else datetime.datetime.fromisoformat(mood["timestamp"]).date()
-        active_days.add(date)
-        mood_trend.append({"date": date.isoformat(), "mood": mood["mood"]})
-        # Mood counts
-        mood_type = mood["mood"]
-        mood_counts[mood_type] = mood_counts.get(mood_type, 0) + 1
-        # Streak calc
-        if prev_day is not None and (date - prev_day).days == 1:
-            streak += 1
-        else:
-            streak = 1
-        prev_day = date
-        if streak > longest_streak:
-            longest_streak = streak
-
-    # Achievements (example logic)
-    achievements = []
-    if total_moods >= 1:
-        achievements.append("First Mood Logged")
-    if longest_streak >= 7:
-        achievements.append("7-Day Mood Streak")
-    if "happy" in mood_counts and mood_counts["happy"] >= 10:
-        achievements.append("10 Happy Days")
-    if total_moods >= 30:
-        achievements.append("30 Days of Tracking")
-
-    dashboard_data = {
-        "total_moods": total_moods,
-        "active_days": len(active_days),
-        "longest_streak": longest_streak,
-        "mood_counts": mood_counts,
-        "mood_trend": mood_trend[-30:],  # Last 30 days for chart
-        "achievements": achievements
-    }
-    return jsonify(dashboard_data), 200
+    # By default reads the precomputed summary kept up to date by POST /api/mood;
+    # DASHBOARD_ENGINE=pipeline|scan computes it from the moods collection instead
+    engine = current_app.config.get('DASHBOARD_ENGINE', 'summary')
+    summary = compute_summary(user_id, engine)
+    return jsonify(dashboard_payload(summary)), 200
+
+# ==== CLI: summary backfill and consistency check ====
+
+def _summary_user_ids(user_id):
+    return [user_id] if user_id else get_mood_store().user_ids()
+
+# flask dashboard rebuild-summaries [--user-id ID]
+@dashboard_bp.cli.command('rebuild-summaries')
+@click.option('--user-id', default=None, help="Only rebuild this user's summary.")
+def rebuild_summaries_command(user_id):
+    """Rebuild precomputed dashboard summaries from the moods collection."""
+    count = 0
+    for uid in _summary_user_ids(user_id):
+        rebuild_summary(uid)
+        count += 1
+    click.echo(f"Rebuilt {count} summaries.")
+
+# flask dashboard check-summaries [--user-id ID] [--engine summary|pipeline] [--fix]
+@dashboard_bp.cli.command('check-summaries')
+@click.option('--user-id', default=None, help="Only check this user's summary.")
+@click.option('--engine', type=click.Choice(['summary', 'pipeline']), default='summary',
+              help="Engine to compare against the full scan.")
+@click.option('--fix', is_flag=True, help="Rebuild summaries that do not match.")
+def check_summaries_command(user_id, engine, fix):
+    """Compare stored (or pipeline) summaries against a full scan of each user's moods."""
+    mismatched = 0
+    for uid in _summary_user_ids(user_id):
+        stored, scanned = check_summary(uid, engine)
+        if stored != scanned:
+            mismatched += 1
+            click.echo(f"Mismatch for user {uid}: stored={stored} scanned={scanned}")
+            if fix:
+                rebuild_summary(uid)
+    click.echo(f"{mismatched} mismatched summaries.")
+    if mismatched and not fix:
+        raise SystemExit(1)
 
 # ==== Example Usage ====
 # GET /api/dashboard (JWT required in Authorization header)
+# flask --app app dashboard rebuild-summaries   (backfill existing users)
+# flask --app app dashboard check-summaries     (exit code 1 on drift)
+# flask --app app dashboard check-summaries --engine pipeline   (pipeline/scan parity)
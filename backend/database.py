@@ -1,20 +1,194 @@
+import asyncio
 import os
-from pymongo import MongoClient
+import threading
+import time
+import pymongo
+from pymongo import MongoClient, monitoring
 from dotenv import load_dotenv
 
-# Load environment variables from .env (if not already loaded)
+# Load environment variables from .env (if not already loaded): entry points such
+# as asgi.py import this module before app.py
 load_dotenv()
 
 # === Environment Variables ===
 MONGO_URI = os.environ.get("MONGO_URI")
-if not MONGO_URI:
-    raise RuntimeError("MONGO_URI is not set in your environment variables or .env file.")
-
 DB_NAME = os.environ.get("MONGO_DB_NAME", "mindcare")  # Default database name is 'mindcare'
 
-# === MongoDB Client and Database ===
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# Connection pool settings (size pools against workers x threads per worker)
+POOL_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", 100)),
+    "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", 0)),
+    "waitQueueTimeoutMS": int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None,
+    "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 0)) or None,
+}
+
+# === Pool checkout metrics ===
+class PoolWaitMetrics(monitoring.ConnectionPoolListener):
+    """Records how long requests wait to check a connection out of the pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._started = threading.local()
+
+    def _record(self, event):
+        # PyMongo >= 4.7 reports the wait itself; otherwise time it per thread
+        wait = getattr(event, "duration", None)
+        if wait is None:
+            started = getattr(self._started, "at", None)
+            wait = time.perf_counter() - started if started is not None else 0.0
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self.checkouts += 1
+        self._record(event)
+
+    def connection_check_out_failed(self, event):
+        self.failures += 1
+        self._record(event)
+
+    def stats(self):
+        return {
+            "checkouts": self.checkouts,
+            "failures": self.failures,
+            "total_wait_seconds": self.total_wait,
+            "max_wait_seconds": self.max_wait,
+        }
+
+    # Remaining pool events are not needed
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_checked_in(self, event): pass
+
+pool_metrics = PoolWaitMetrics()
+
+# === Lazy, per-process MongoDB client ===
+_client_factory = MongoClient
+_event_listeners = [pool_metrics]
+_client = None
+_database = None
+_client_pid = None
+_lock = threading.Lock()
+
+def set_client_factory(factory):
+    """
+    Swap the client implementation, e.g. set_client_factory(mongomock.MongoClient)
+    in tests. factory(uri, **options) must return a MongoClient-like object.
+    """
+    global _client_factory
+    _client_factory = factory
+    reset_client()
+
+def add_event_listener(listener):
+    """Register a pymongo monitoring listener for clients created from now on."""
+    _event_listeners.append(listener)
+    reset_client()
+
+def reset_client():
+    """
+    Close the current client; the next access creates a new one. A client
+    inherited across fork() is only discarded: its sockets belong to the parent.
+    """
+    global _client, _database, _client_pid
+    with _lock:
+        client, owned = _client, _client_pid == os.getpid()
+        _client = _database = None
+        _client_pid = None
+    if client is not None and owned:
+        client.close()
+
+def get_client():
+    """The MongoClient for this process, created on first use (and again after fork)."""
+    global _client, _database, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                if _client_factory is MongoClient and not MONGO_URI:
+                    raise RuntimeError("MONGO_URI is not set in your environment variables or .env file.")
+                options = {key: value for key, value in POOL_OPTIONS.items() if value is not None}
+                _client = _client_factory(MONGO_URI, event_listeners=list(_event_listeners), **options)
+                _database = _client[DB_NAME]
+                _client_pid = os.getpid()
+    return _client
+
+def get_db():
+    if _database is None or _client_pid != os.getpid():
+        get_client()
+    return _database
+
+def ping(timeout=2.0):
+    """One round trip to the server, giving up after `timeout` seconds (readiness checks)."""
+    with pymongo.timeout(timeout):
+        get_db().command("ping")
+
+class _LazyDatabase:
+    """Stand-in for the Database object that resolves it on first attribute access."""
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
+
+# === Asyncio client (ASGI mode, see asgi.py) ===
+_async_client_factory = None  # pymongo.AsyncMongoClient unless overridden
+_async_client = None
+_async_database = None
+_async_loop = None
+
+def set_async_client_factory(factory):
+    """Swap the asyncio client implementation; same contract as set_client_factory."""
+    global _async_client_factory, _async_client, _async_database, _async_loop
+    _async_client_factory = factory
+    _async_client = _async_database = _async_loop = None
+
+def get_async_db():
+    """
+    The AsyncMongoClient database for the running event loop (PyMongo >= 4.10),
+    created on first use. Only call this from coroutines.
+    """
+    global _async_client, _async_database, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_database is None or _async_loop is not loop:
+        factory = _async_client_factory
+        if factory is None:
+            from pymongo import AsyncMongoClient
+            if not MONGO_URI:
+                raise RuntimeError("MONGO_URI is not set in your environment variables or .env file.")
+            factory = AsyncMongoClient
+        options = {key: value for key, value in POOL_OPTIONS.items() if value is not None}
+        _async_client = factory(MONGO_URI, event_listeners=list(_event_listeners), **options)
+        _async_database = _async_client[DB_NAME]
+        _async_loop = loop
+    return _async_database
+
+def _after_fork_in_child():
+    # The parent's lock may have been held mid-fork; start over without touching it
+    global _client, _database, _client_pid, _lock
+    global _async_client, _async_database, _async_loop
+    _lock = threading.Lock()
+    _client = _database = None
+    _client_pid = None
+    _async_client = _async_database = _async_loop = None
+
+# Clients must not be shared across fork(); children build their own on first use
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+# === MongoDB Database ===
+db = _LazyDatabase()
 
 # === Usage Example (for other modules) ===
 # from database import db
@@ -0,0 +1,79 @@
+from flask import Blueprint, request, jsonify, current_app, Response
+from utils.auth import require_auth
+from models.mood_store import get_mood_store
+from models.chat_archive import iter_chat_history
+import csv
+import datetime
+import io
+from utils.json_provider import dumps_bytes
+
+export_bp = Blueprint('export', __name__)
+
+# Exported fields per collection (also the CSV column order)
+EXPORT_FIELDS = {
+    "moods": ["timestamp", "mood", "note"],
+    "chatlogs": ["timestamp", "message", "bot_response", "mood"],
+}
+
+# ==== Helpers ====
+def _plain(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+def iter_history(collection, user_id, batch_size):
+    """Iterate a user's documents oldest first, reading only the exported fields."""
+    fields = EXPORT_FIELDS[collection]
+    if collection == "moods":
+        return get_mood_store().iter_user(user_id, batch_size, fields)
+    # Archived segments first, then the hot collection
+    return iter_chat_history(user_id, batch_size=batch_size, fields=fields)
+
+def ndjson_lines(docs, fields):
+    for doc in docs:
+        yield dumps_bytes({field: doc.get(field) for field in fields}, sort_keys=False) + b"\n"
+
+def csv_lines(docs, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for doc in docs:
+        writer.writerow([_plain(doc.get(field, "")) for field in fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when there are no documents
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(collection, user_id, fmt, docs=None):
+    """Streaming Response for a user's collection history; memory use is independent of its size."""
+    fields = EXPORT_FIELDS[collection]
+    if docs is None:
+        docs = iter_history(collection, user_id, current_app.config.get('EXPORT_BATCH_SIZE', 1000))
+    if fmt == "csv":
+        body, mimetype, extension = csv_lines(docs, fields), "text/csv", "csv"
+    else:
+        body, mimetype, extension = ndjson_lines(docs, fields), "application/x-ndjson", "ndjson"
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{collection}.{extension}"'
+    return response
+
+# ==== Endpoints ====
+
+# GET /api/export/moods?format=ndjson|csv
+# GET /api/export/chatlogs?format=ndjson|csv
+@export_bp.route('/export/<collection>', methods=['GET'])
+@require_auth
+def export_history(collection):
+    """Streams the user's full mood or chat history as NDJSON (default) or CSV."""
+    if collection not in EXPORT_FIELDS:
+        return jsonify({"error": "Unknown export."}), 404
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv."}), 400
+    return export_response(collection, request.user_id, fmt)
+
+# ==== Example Usage ====
+# GET /api/export/moods?format=csv (Authorization header required)
+# curl -H "Authorization: Bearer <token>" http://localhost:5000/api/export/chatlogs > chats.ndjson
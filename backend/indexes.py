@@ -0,0 +1,146 @@
+import datetime
+import click
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from database import db
+
+# ==== Required indexes ====
+# Every hot query in the blueprints relies on one of these.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "moods": [
+        # _id breaks timestamp ties for keyset pagination in GET /api/moods
+        IndexModel([("user_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+                   name="user_id_timestamp_id"),
+    ],
+    # MOODS_STORAGE=buckets: pages walk buckets by "end", inserts find a bucket by month
+    "mood_buckets": [
+        IndexModel([("user_id", ASCENDING), ("end", ASCENDING)], name="user_id_end"),
+        IndexModel([("user_id", ASCENDING), ("month", ASCENDING), ("count", ASCENDING)], name="user_id_month_count"),
+    ],
+    "mood_summaries": [
+        IndexModel([("user_id", ASCENDING)], unique=True, name="user_id_unique"),
+    ],
+    "chatlogs": [
+        # _id keeps archive compaction order stable between runs (see models/chat_archive.py)
+        IndexModel([("user_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+                   name="user_id_timestamp_id"),
+    ],
+    "chatlog_archives": [
+        IndexModel([("user_id", ASCENDING), ("start", ASCENDING)], name="user_id_start"),
+    ],
+    "resources": [
+        IndexModel([("topics", ASCENDING)], name="topics"),
+    ],
+    "rate_limits": [
+        # ADMISSION_BACKEND=mongodb: idle token buckets are dropped by the TTL monitor
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+}
+
+# ==== Registered query shapes ====
+# (name, collection, build cursor) -- explained by verify_query_plans().
+# Add an entry here whenever a blueprint gains a new query.
+QUERY_SHAPES = [
+    ("auth: user by email", "users", lambda c: c.find({"email": "probe@example.com"})),
+    ("mood: moods page", "moods",
+     lambda c: c.find({"$and": [
+         {"user_id": "probe"},
+         {"timestamp": {"$gte": datetime.datetime(2024, 1, 1)}},
+         {"$or": [
+             {"timestamp": {"$lt": datetime.datetime(2024, 2, 1)}},
+             {"timestamp": datetime.datetime(2024, 2, 1), "_id": {"$lt": ObjectId()}},
+         ]},
+     ]}).sort([("timestamp", -1), ("_id", -1)]).limit(31)),
+    ("dashboard: mood history scan", "moods",
+     lambda c: c.find({"user_id": "probe"}).sort([("timestamp", 1), ("_id", 1)])),
+    ("dashboard: legacy timestamp check", "moods",
+     lambda c: c.find({"user_id": "probe", "timestamp": {"$type": "string"}})),
+    ("mood: bucket page", "mood_buckets",
+     lambda c: c.find({"user_id": "probe", "start": {"$lte": datetime.datetime(2024, 2, 1)}}).sort("end", -1)),
+    ("mood: bucket with room", "mood_buckets",
+     lambda c: c.find({"user_id": "probe", "month": "2024-02", "count": {"$lte": 499}})),
+    ("mood: buckets in order", "mood_buckets",
+     lambda c: c.find({"user_id": "probe"}).sort([("month", 1), ("start", 1)])),
+    ("dashboard: summary by user", "mood_summaries", lambda c: c.find({"user_id": "probe"})),
+    ("chatbot: chat history", "chatlogs",
+     lambda c: c.find({"user_id": "probe", "timestamp": {"$gte": datetime.datetime(2024, 1, 1)}})
+     .sort([("timestamp", 1), ("_id", 1)])),
+    ("chatbot: chats to archive", "chatlogs",
+     lambda c: c.find({"user_id": "probe", "timestamp": {"$lt": datetime.datetime(2024, 1, 1)}})
+     .sort([("timestamp", 1), ("_id", 1)]).limit(5000)),
+    ("chatbot: archive segments", "chatlog_archives",
+     lambda c: c.find({"user_id": "probe", "end": {"$gte": datetime.datetime(2024, 1, 1)}}).sort("start", 1)),
+    ("resources: by topic", "resources", lambda c: c.find({"topics": "stress"})),
+]
+
+class IndexVerificationError(RuntimeError):
+    """A registered query shape is not served by an index."""
+
+def ensure_indexes(database=None):
+    """Create all required indexes. Safe to call repeatedly."""
+    database = database if database is not None else db
+    created = {}
+    for collection, models in INDEXES.items():
+        created[collection] = database[collection].create_indexes(models)
+    return created
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+def verify_query_plans(database=None):
+    """
+    explain() each registered query shape and raise IndexVerificationError
+    if any winning plan contains a COLLSCAN, or is an EOF plan (which says
+    nothing about indexes). Missing collections are created first, without
+    indexes, so a query on one fails rather than passing as EOF.
+    Returns {name: [stages]} for the shapes that passed.
+    """
+    database = database if database is not None else db
+    existing = set(database.list_collection_names())
+    for collection in {collection for _, collection, _ in QUERY_SHAPES} - existing:
+        database.create_collection(collection)
+    plans = {}
+    failures = []
+    for name, collection, build in QUERY_SHAPES:
+        explain = build(database[collection]).explain()
+        stages = list(_plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {})))
+        plans[name] = stages
+        if "COLLSCAN" in stages:
+            failures.append(f"{name} ({collection}): {' <- '.join(stages)}")
+        elif not stages or stages == ["EOF"]:
+            failures.append(f"{name} ({collection}): inconclusive plan {' <- '.join(stages) or '(none)'}")
+    if failures:
+        raise IndexVerificationError("Query shapes not served by an index:\n  " + "\n  ".join(failures))
+    return plans
+
+# ==== CLI ====
+indexes_cli = click.Group('indexes', help="Manage MongoDB indexes.")
+
+# flask indexes ensure
+@indexes_cli.command('ensure')
+def ensure_command():
+    """Create required indexes (idempotent)."""
+    for collection, names in ensure_indexes().items():
+        click.echo(f"{collection}: {', '.join(names)}")
+
+# flask indexes verify
+@indexes_cli.command('verify')
+def verify_command():
+    """Fail if any registered query shape would use a collection scan."""
+    try:
+        plans = verify_query_plans()
+    except IndexVerificationError as e:
+        raise click.ClickException(str(e))
+    for name, stages in plans.items():
+        click.echo(f"ok  {name}: {' <- '.join(stages)}")
@@ -0,0 +1,183 @@
+import datetime
+import gzip
+import itertools
+from bson import Binary, ObjectId
+from pymongo.errors import DuplicateKeyError
+from database import db
+from utils.json_provider import dumps_bytes, loads
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
+# ==== Chat log retention ====
+# Recent chats stay in db.chatlogs (one document per message). Chats older than
+# CHATLOG_HOT_DAYS are compacted, per user and oldest first, into append-only
+# segments in db.chatlog_archives:
+# {
+#   "_id": <_id of the segment's first chat>, "user_id": "...",
+#   "start": <first timestamp>, "end": <last timestamp>, "count": 5000,
+#   "codec": "gzip", "raw_bytes": 1234567, "compressed_bytes": 98765, "data": <compressed NDJSON>,
+#   "blocks": [{"ts": <first timestamp>, "offset": 0, "count": 256}, ...]
+# }
+# "data" is a run of independently compressed blocks of NDJSON lines, and
+# "blocks" is the offset index into it, so a read from a point in time only
+# decompresses the blocks it needs. Segments are never modified once written.
+ARCHIVE_FIELDS = ["timestamp", "message", "bot_response", "mood"]
+
+def _zstd_compress(data):
+    return zstandard.ZstdCompressor(level=10).compress(data)
+
+def _zstd_decompress(data):
+    return zstandard.ZstdDecompressor().decompress(data)
+
+CODECS = {
+    "gzip": (lambda data: gzip.compress(data, compresslevel=6, mtime=0), gzip.decompress),
+    "zstd": (_zstd_compress, _zstd_decompress),
+}
+
+def check_codec(codec):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown CHATLOG_ARCHIVE_CODEC {codec!r}; expected one of {', '.join(CODECS)}.")
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("CHATLOG_ARCHIVE_CODEC=zstd needs the zstandard package.")
+    return codec
+
+# ==== Segments ====
+def _line(chat):
+    doc = {"_id": str(chat["_id"]), **{field: chat.get(field) for field in ARCHIVE_FIELDS}}
+    return dumps_bytes(doc, sort_keys=False) + b"\n"
+
+def _chat(line, user_id):
+    doc = loads(line)
+    doc["_id"] = ObjectId(doc["_id"])
+    doc["timestamp"] = datetime.datetime.fromisoformat(doc["timestamp"])
+    doc["user_id"] = user_id
+    return doc
+
+def build_segment(user_id, chats, block_size=256, codec="gzip"):
+    """Segment document for chats (sorted by timestamp, _id) of one user."""
+    compress = CODECS[check_codec(codec)][0]
+    data = bytearray()
+    blocks = []
+    raw_bytes = 0
+    for i in range(0, len(chats), block_size):
+        block = chats[i:i + block_size]
+        raw = b"".join(_line(chat) for chat in block)
+        blocks.append({"ts": block[0]["timestamp"], "offset": len(data), "count": len(block)})
+        data += compress(raw)
+        raw_bytes += len(raw)
+    return {
+        "_id": chats[0]["_id"],
+        "user_id": user_id,
+        "start": chats[0]["timestamp"],
+        "end": chats[-1]["timestamp"],
+        "count": len(chats),
+        "codec": codec,
+        "raw_bytes": raw_bytes,
+        "compressed_bytes": len(data),
+        "data": Binary(bytes(data)),
+        "blocks": blocks,
+    }
+
+def read_segment(segment, start=None):
+    """A segment's chats oldest first, skipping blocks that end before `start`."""
+    decompress = CODECS[segment["codec"]][1]
+    data = bytes(segment["data"])
+    blocks = segment["blocks"]
+    first = 0
+    if start is not None:
+        # Skip blocks followed by one that starts before `start`
+        while first + 1 < len(blocks) and blocks[first + 1]["ts"] < start:
+            first += 1
+    for i in range(first, len(blocks)):
+        end = blocks[i + 1]["offset"] if i + 1 < len(blocks) else len(data)
+        for line in decompress(data[blocks[i]["offset"]:end]).splitlines():
+            yield _chat(line, segment["user_id"])
+
+# ==== Compaction ====
+def compact_user(user_id, cutoff, segment_size=5000, block_size=256, codec="gzip"):
+    """
+    Move the user's chats older than `cutoff` into archive segments.
+    Each segment is written before its chats are deleted, and a segment left
+    behind by an interrupted run is detected by its _id, so re-running is safe.
+    Returns the number of chats archived.
+    """
+    archived = 0
+    while True:
+        chats = list(
+            db.chatlogs.find({"user_id": user_id, "timestamp": {"$lt": cutoff}})
+            .sort([("timestamp", 1), ("_id", 1)])
+            .limit(segment_size)
+        )
+        if not chats:
+            return archived
+        segment = build_segment(user_id, chats, block_size, codec)
+        try:
+            db.chatlog_archives.insert_one(segment)
+            ids = [chat["_id"] for chat in chats]
+        except DuplicateKeyError:
+            # Written by a run that died before deleting these chats: delete exactly what it holds
+            ids = [chat["_id"] for chat in read_segment(db.chatlog_archives.find_one({"_id": segment["_id"]}))]
+        archived += db.chatlogs.delete_many({"_id": {"$in": ids}}).deleted_count
+
+def compact_chatlogs(hot_days, segment_size=5000, block_size=256, codec="gzip", user_id=None, now=None):
+    """Archive every user's chats older than hot_days. Returns (users checked, chats archived)."""
+    cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=hot_days)
+    # An unfiltered distinct walks the user_id index (a filter on timestamp would scan)
+    users = [user_id] if user_id else db.chatlogs.distinct("user_id")
+    archived = sum(compact_user(uid, cutoff, segment_size, block_size, codec) for uid in users)
+    return len(users), archived
+
+# ==== Streaming reads ====
+def iter_archived(user_id, start=None, end=None):
+    """Archived chats oldest first, one segment in memory at a time."""
+    query = {"user_id": user_id}
+    if start is not None:
+        query["end"] = {"$gte": start}
+    if end is not None:
+        query["start"] = {"$lt": end}
+    cursor = db.chatlog_archives.find(query).sort("start", 1).batch_size(1)
+    try:
+        for segment in cursor:
+            for chat in read_segment(segment, start):
+                if end is not None and chat["timestamp"] >= end:
+                    return
+                if start is None or chat["timestamp"] >= start:
+                    yield chat
+    finally:
+        cursor.close()
+
+def iter_hot(user_id, start=None, end=None, batch_size=1000, fields=None):
+    projection = {"_id": 0, **{field: 1 for field in fields}} if fields else None
+    query = {"user_id": user_id}
+    time_range = {}
+    if start is not None:
+        time_range["$gte"] = start
+    if end is not None:
+        time_range["$lt"] = end
+    if time_range:
+        query["timestamp"] = time_range
+    cursor = db.chatlogs.find(query, projection).sort([("timestamp", 1), ("_id", 1)]).batch_size(batch_size)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+def iter_chat_history(user_id, start=None, end=None, batch_size=1000, fields=None):
+    """
+    A user's whole chat history oldest first: archived segments, then the hot collection.
+    fields limits what is read from the hot collection (segments only hold ARCHIVE_FIELDS).
+    """
+    return itertools.chain(iter_archived(user_id, start, end), iter_hot(user_id, start, end, batch_size, fields))
+
+def archive_stats(user_id=None):
+    query = {"user_id": user_id} if user_id else {}
+    stats = {"segments": 0, "chats": 0, "raw_bytes": 0, "compressed_bytes": 0}
+    for segment in db.chatlog_archives.find(query, {"count": 1, "raw_bytes": 1, "compressed_bytes": 1}):
+        stats["segments"] += 1
+        stats["chats"] += segment["count"]
+        stats["raw_bytes"] += segment["raw_bytes"]
+        stats["compressed_bytes"] += segment["compressed_bytes"]
+    return stats
@@ -0,0 +1,290 @@
+import bisect
+import datetime
+from pymongo.errors import DuplicateKeyError
+from database import db
+from models.mood_store import get_mood_store
+
+# Number of most recent mood entries kept for the dashboard chart
+TREND_SIZE = 30
+
+# ==== Helpers ====
+def to_datetime(timestamp):
+    """
+    Mood timestamps are stored as naive UTC datetimes, older entries as ISO strings.
+    Offsets (and "Z") are converted to naive UTC so every timestamp compares with the stored ones.
+    """
+    if not isinstance(timestamp, datetime.datetime):
+        timestamp = datetime.datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def to_date(timestamp):
+    return to_datetime(timestamp).date()
+
+def walk_streaks(days):
+    """
+    Walk sorted, distinct active days.
+    Returns (longest_streak, last_day, tail) where tail is the length of the
+    run of consecutive days ending on last_day.
+    """
+    longest = 0
+    tail = 0
+    prev_day = None
+    for day in days:
+        if prev_day is not None and (day - prev_day).days == 1:
+            tail += 1
+        else:
+            tail = 1
+        prev_day = day
+        if tail > longest:
+            longest = tail
+    return longest, prev_day, tail
+
+# ==== Summary document ====
+# One document per user in db.mood_summaries:
+# {
+#   "user_id": "...",
+#   "total_moods": 42,
+#   "mood_counts": {"happy": 20, "sad": 22},
+#   "active_days": 15,
+#   "longest_streak": 7,
+#   "last_day": "2024-05-01",      # most recent active day
+#   "streak_tail": 3,              # consecutive days ending on last_day
+#   "trend": [{"timestamp": ..., "_id": ..., "date": "2024-05-01", "mood": "happy"}, ...],
+#   "rev": 12                      # bumped on every write, used for compare-and-set
+# }
+# The trend keeps entry ids so record_moods() can tell whether a rebuild that ran
+# after an insert already counted the entry (see counted_in_summary).
+
+def build_summary(user_id, mood_counts, days, trend):
+    """Assemble a summary from mood counts, sorted distinct days and the trend tail."""
+    longest, last_day, tail = walk_streaks(days)
+    return {
+        "user_id": user_id,
+        "total_moods": sum(mood_counts.values()),
+        "mood_counts": mood_counts,
+        "active_days": len(days),
+        "longest_streak": longest,
+        "last_day": last_day.isoformat() if last_day else None,
+        "streak_tail": tail,
+        "trend": trend[-TREND_SIZE:],
+    }
+
+def summarize_moods(user_id, moods):
+    """Full scan: build a summary from mood documents sorted by timestamp."""
+    mood_counts = {}
+    active_days = set()
+    trend = []
+    for mood in moods:
+        timestamp = to_datetime(mood["timestamp"])
+        date = timestamp.date()
+        active_days.add(date)
+        mood_counts[mood["mood"]] = mood_counts.get(mood["mood"], 0) + 1
+        trend.append({"timestamp": timestamp, "_id": mood["_id"], "date": date.isoformat(), "mood": mood["mood"]})
+        if len(trend) > TREND_SIZE:
+            trend.pop(0)
+    return build_summary(user_id, mood_counts, sorted(active_days), trend)
+
+def apply_mood(summary, mood, timestamp, entry_id=None):
+    """
+    Fold a single new mood entry into a summary in place.
+    Returns False if the entry is backdated before the last active day,
+    in which case the streaks cannot be updated without a rebuild.
+    """
+    timestamp = to_datetime(timestamp)
+    date = timestamp.date()
+    last_day = datetime.date.fromisoformat(summary["last_day"]) if summary.get("last_day") else None
+    if last_day is not None and date < last_day:
+        return False
+
+    if last_day is None or date > last_day:
+        if last_day is not None and (date - last_day).days == 1:
+            summary["streak_tail"] += 1
+        else:
+            summary["streak_tail"] = 1
+        summary["active_days"] += 1
+        summary["last_day"] = date.isoformat()
+        summary["longest_streak"] = max(summary["longest_streak"], summary["streak_tail"])
+
+    summary["total_moods"] += 1
+    summary["mood_counts"][mood] = summary["mood_counts"].get(mood, 0) + 1
+
+    trend = summary["trend"]
+    position = bisect.bisect_right([entry["timestamp"] for entry in trend], timestamp)
+    trend.insert(position, {"timestamp": timestamp, "_id": entry_id, "date": date.isoformat(), "mood": mood})
+    del trend[:-TREND_SIZE]
+    return True
+
+def dashboard_payload(summary):
+    """Shape a summary into the JSON returned by GET /api/dashboard."""
+    total_moods = summary["total_moods"]
+    mood_counts = summary["mood_counts"]
+    longest_streak = summary["longest_streak"]
+
+    # Achievements (example logic)
+    achievements = []
+    if total_moods >= 1:
+        achievements.append("First Mood Logged")
+    if longest_streak >= 7:
+        achievements.append("7-Day Mood Streak")
+    if "happy" in mood_counts and mood_counts["happy"] >= 10:
+        achievements.append("10 Happy Days")
+    if total_moods >= 30:
+        achievements.append("30 Days of Tracking")
+
+    return {
+        "total_moods": total_moods,
+        "active_days": summary["active_days"],
+        "longest_streak": longest_streak,
+        "mood_counts": mood_counts,
+        "mood_trend": [{"date": entry["date"], "mood": entry["mood"]} for entry in summary["trend"]],
+        "achievements": achievements
+    }
+
+# ==== Persistence ====
+MAX_WRITE_ATTEMPTS = 3
+
+def load_summary(user_id):
+    return db.mood_summaries.find_one({"user_id": user_id}, {"_id": 0})
+
+def scan_summary(user_id):
+    """Recompute a summary from the user's full mood history."""
+    return summarize_moods(user_id, get_mood_store().iter_user(user_id))
+
+def pipeline_summary(user_id):
+    """
+    Recompute a summary with a server-side aggregation: MongoDB groups by mood,
+    collects distinct days and picks the trend tail, so only the streak walk
+    over distinct days runs in Python.
+    """
+    store = get_mood_store()
+    # Legacy entries with ISO string timestamps can't be grouped by date server-side
+    if store.has_string_timestamps(user_id):
+        return scan_summary(user_id)
+
+    pipeline = store.entries_pipeline(user_id) + [
+        {"$facet": {
+            "counts": [{"$group": {"_id": "$mood", "count": {"$sum": 1}}}],
+            "days": [
+                {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}}},
+                {"$sort": {"_id": 1}},
+            ],
+            "trend": [
+                {"$sort": {"timestamp": -1, "_id": -1}},
+                {"$limit": TREND_SIZE},
+                {"$project": {"_id": 1, "timestamp": 1, "mood": 1}},
+            ],
+        }},
+    ]
+    result = next(store.aggregate(pipeline), {"counts": [], "days": [], "trend": []})
+    mood_counts = {row["_id"]: row["count"] for row in result["counts"]}
+    days = [datetime.date.fromisoformat(row["_id"]) for row in result["days"]]
+    trend = [
+        {"timestamp": row["timestamp"], "_id": row["_id"], "date": row["timestamp"].date().isoformat(), "mood": row["mood"]}
+        for row in reversed(result["trend"])
+    ]
+    return build_summary(user_id, mood_counts, days, trend)
+
+def _save_summary(summary, prev_rev):
+    """Compare-and-set write; returns False if another writer got there first."""
+    if prev_rev is None:
+        summary["rev"] = 1
+        try:
+            result = db.mood_summaries.replace_one(
+                {"user_id": summary["user_id"], "rev": {"$exists": False}}, summary, upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return result.matched_count == 1 or result.upserted_id is not None
+    summary["rev"] = prev_rev + 1
+    result = db.mood_summaries.replace_one({"user_id": summary["user_id"], "rev": prev_rev}, summary)
+    return result.matched_count == 1
+
+def rebuild_summary(user_id):
+    """Rebuild and store a user's summary from their mood history (backfill)."""
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        current = load_summary(user_id)
+        prev_rev = current.get("rev") if current else None
+        summary = pipeline_summary(user_id)
+        if _save_summary(summary, prev_rev):
+            break
+    return summary
+
+def _trend_key(timestamp, entry_id):
+    # MongoDB keeps datetimes to the millisecond
+    return timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000), entry_id
+
+def counted_in_summary(summary, timestamp, entry_id):
+    """
+    Whether the summary already includes a stored entry, e.g. because a rebuild
+    ran between its insert and record_moods(). None when it can't tell: the
+    entry is older than the whole trend tail, or the trend predates entry ids.
+    """
+    trend = summary["trend"]
+    if any(item.get("_id") is None for item in trend):
+        return None
+    keys = {_trend_key(item["timestamp"], item["_id"]) for item in trend}
+    key = _trend_key(timestamp, entry_id)
+    if key in keys:
+        return True
+    # A short trend holds every entry; otherwise it holds every entry newer than its oldest
+    if len(trend) < TREND_SIZE or key > min(keys):
+        return False
+    return None
+
+def record_moods(user_id, entries):
+    """
+    Incrementally update the user's summary after mood entries are written.
+    entries: iterable of (mood, timestamp, entry _id); the summary is written once.
+    Entries the summary already counts are skipped, so this is safe to run after a rebuild.
+    """
+    try:
+        entries = sorted(((mood, to_datetime(timestamp), entry_id) for mood, timestamp, entry_id in entries),
+                         key=lambda entry: entry[1])
+    except (TypeError, ValueError):
+        # The entries are already stored; never leave the summary behind them
+        return rebuild_summary(user_id)
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        summary = load_summary(user_id)
+        if summary is None:
+            return rebuild_summary(user_id)
+        try:
+            counted = [counted_in_summary(summary, timestamp, entry_id) for _, timestamp, entry_id in entries]
+            pending = [entry for entry, done in zip(entries, counted) if not done]
+            applied = None not in counted and all(apply_mood(summary, *entry) for entry in pending)
+        except (TypeError, ValueError):
+            applied = False
+        if not applied:
+            return rebuild_summary(user_id)
+        if not pending or _save_summary(summary, summary.get("rev", 0)):
+            return summary
+    return rebuild_summary(user_id)
+
+def record_mood(user_id, mood, timestamp, entry_id):
+    """Incrementally update the user's summary after a mood entry is written."""
+    return record_moods(user_id, [(mood, timestamp, entry_id)])
+
+def compute_summary(user_id, engine="summary"):
+    """
+    Summary for the dashboard using the configured engine:
+    "summary" reads the precomputed document (rebuilding it if missing),
+    "pipeline" aggregates server-side and "scan" walks every mood document.
+    """
+    if engine == "scan":
+        return scan_summary(user_id)
+    if engine == "pipeline":
+        return pipeline_summary(user_id)
+    return load_summary(user_id) or rebuild_summary(user_id)
+
+def check_summary(user_id, engine="summary"):
+    """
+    Compare an engine's result against a full scan.
+    Returns (engine_payload, scanned_payload); they match when consistent.
+    """
+    if engine == "summary":
+        summary = load_summary(user_id)
+    else:
+        summary = compute_summary(user_id, engine)
+    scanned = dashboard_payload(scan_summary(user_id))
+    return (dashboard_payload(summary) if summary else None), scanned
@@ -0,0 +1,399 @@
+import heapq
+import itertools
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+from database import db
+
+# ==== Mood storage engines ====
+# Every read and write of mood entries goes through the configured store
+# (MOODS_STORAGE), so the blueprints and the summary code don't care how
+# entries are laid out. Entries always come back as
+# {"_id", "user_id", "mood", "timestamp", "note"}, newest or oldest first
+# by (timestamp, _id), whatever the engine.
+
+def _page_conditions(start, end, before):
+    """Python-side version of the GET /api/moods filter, for engines that can't push it down."""
+    def matches(entry):
+        timestamp = entry["timestamp"]
+        if start is not None and timestamp < start:
+            return False
+        if end is not None and timestamp >= end:
+            return False
+        if before is not None and (timestamp, entry["_id"]) >= before:
+            return False
+        return True
+    return matches
+
+class DocumentMoodStore:
+    """One document per mood entry in db.moods (the original layout)."""
+
+    name = "documents"
+    collection = "moods"
+
+    def insert(self, entry):
+        db.moods.insert_one(entry)
+        return entry
+
+    def insert_many(self, entries):
+        """Insert entries (unordered); returns {position: error message} for failed ones."""
+        if not entries:
+            return {}
+        try:
+            db.moods.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            return {error["index"]: error.get("errmsg", "Write failed.") for error in e.details.get("writeErrors", [])}
+        return {}
+
+    def find_existing(self, user_id, timestamps):
+        """(timestamp, mood) of the user's entries stored at any of these timestamps."""
+        existing = db.moods.find(
+            {"user_id": user_id, "timestamp": {"$in": list(timestamps)}},
+            {"_id": 0, "timestamp": 1, "mood": 1}
+        )
+        return [(doc["timestamp"], doc["mood"]) for doc in existing]
+
+    def page_query(self, user_id, start=None, end=None, before=None):
+        conditions = [{"user_id": user_id}]
+        time_range = {}
+        if start is not None:
+            time_range["$gte"] = start
+        if end is not None:
+            time_range["$lt"] = end
+        if time_range:
+            conditions.append({"timestamp": time_range})
+        if before is not None:
+            conditions.append({"$or": [
+                {"timestamp": {"$lt": before[0]}},
+                {"timestamp": before[0], "_id": {"$lt": before[1]}},
+            ]})
+        return {"$and": conditions}
+
+    def page(self, user_id, limit, start=None, end=None, before=None):
+        """Up to `limit` entries newest first, older than the `before` (timestamp, _id) key."""
+        query = self.page_query(user_id, start, end, before)
+        return list(db.moods.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit))
+
+    async def page_async(self, database, user_id, limit, start=None, end=None, before=None):
+        """page() on an asyncio database (see database.get_async_db)."""
+        query = self.page_query(user_id, start, end, before)
+        cursor = database.moods.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+        return await cursor.to_list(None)
+
+    def iter_user(self, user_id, batch_size=1000, fields=None):
+        """All of a user's entries oldest first, through a server-side cursor; only `fields` if given."""
+        projection = {"_id": 0, **{field: 1 for field in fields}} if fields else None
+        cursor = (
+            db.moods.find({"user_id": user_id}, projection)
+            .sort([("timestamp", 1), ("_id", 1)])
+            .batch_size(batch_size)
+        )
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def entries_pipeline(self, user_id):
+        """Aggregation stages that yield the user's entries as plain mood documents."""
+        return [{"$match": {"user_id": user_id}}]
+
+    def aggregate(self, pipeline):
+        return db.moods.aggregate(pipeline)
+
+    def has_string_timestamps(self, user_id):
+        """Legacy entries stored ISO strings instead of datetimes."""
+        return db.moods.find_one({"user_id": user_id, "timestamp": {"$type": "string"}}, {"_id": 1}) is not None
+
+    def convert_string_timestamps(self, user_id=None, batch_size=1000):
+        """
+        Rewrite legacy ISO string timestamps as naive UTC datetimes, so paging
+        (which filters and sorts on BSON dates) sees them. Returns the number converted.
+        """
+        from models.mood import to_datetime
+        query = {"timestamp": {"$type": "string"}}
+        if user_id is not None:
+            query["user_id"] = user_id
+        converted = 0
+        cursor = db.moods.find(query, {"timestamp": 1}).batch_size(batch_size)
+        try:
+            for doc in cursor:
+                # Matching the old string keeps a concurrent rewrite from being clobbered
+                result = db.moods.update_one(
+                    {"_id": doc["_id"], "timestamp": doc["timestamp"]},
+                    {"$set": {"timestamp": to_datetime(doc["timestamp"])}}
+                )
+                converted += result.modified_count
+        finally:
+            cursor.close()
+        return converted
+
+    def scan_columns(self, batch_size=100000):
+        """Every user's entries in storage order as (user_ids, moods, timestamps) lists of up to batch_size."""
+        cursor = db.moods.find({}, {"_id": 0, "user_id": 1, "mood": 1, "timestamp": 1}).batch_size(batch_size)
+        try:
+            while True:
+                batch = list(itertools.islice(cursor, batch_size))
+                if not batch:
+                    return
+                yield ([doc["user_id"] for doc in batch], [doc["mood"] for doc in batch],
+                       [doc["timestamp"] for doc in batch])
+        finally:
+            cursor.close()
+
+    def user_ids(self):
+        return db.moods.distinct("user_id")
+
+    def delete_user(self, user_id):
+        return db.moods.delete_many({"user_id": user_id}).deleted_count
+
+class BucketMoodStore:
+    """
+    Entries packed into per-user, per-month documents in db.mood_buckets:
+    {
+      "user_id": "...", "month": "2024-05", "count": 3,
+      "start": <earliest timestamp>, "end": <latest timestamp>,
+      "entries": [{"_id": ObjectId, "mood": "happy", "timestamp": ..., "note": ""}, ...]
+    }
+    user_id and field names are stored once per bucket and the indexes hold one
+    key per bucket, not per entry. A month that outgrows bucket_size spills into
+    another bucket for the same month. Entries keep their own _id, so API ids
+    and pagination cursors stay valid across engines.
+    """
+
+    name = "buckets"
+    collection = "mood_buckets"
+
+    def __init__(self, bucket_size=500):
+        self.bucket_size = bucket_size
+
+    @staticmethod
+    def _entry(entry):
+        return {"_id": entry["_id"], "mood": entry["mood"], "timestamp": entry["timestamp"], "note": entry.get("note", "")}
+
+    @staticmethod
+    def _flatten(bucket):
+        for entry in bucket["entries"]:
+            yield dict(entry, user_id=bucket["user_id"])
+
+    def _pushes(self, entries):
+        """(filter, update, positions) appending entries to their month's bucket, a chunk at a time."""
+        by_bucket = {}
+        for position, entry in enumerate(entries):
+            entry.setdefault("_id", ObjectId())
+            key = (entry["user_id"], entry["timestamp"].strftime("%Y-%m"))
+            by_bucket.setdefault(key, []).append(position)
+        for (user_id, month), positions in by_bucket.items():
+            for i in range(0, len(positions), self.bucket_size):
+                chunk = positions[i:i + self.bucket_size]
+                timestamps = [entries[position]["timestamp"] for position in chunk]
+                # Any bucket of this month with room for the whole chunk, else a new one
+                query = {"user_id": user_id, "month": month, "count": {"$lte": self.bucket_size - len(chunk)}}
+                update = {
+                    "$push": {"entries": {"$each": [self._entry(entries[position]) for position in chunk]}},
+                    "$inc": {"count": len(chunk)},
+                    "$min": {"start": min(timestamps)},
+                    "$max": {"end": max(timestamps)},
+                }
+                yield query, update, chunk
+
+    def insert(self, entry):
+        failed = self.insert_many([entry])
+        if failed:
+            raise RuntimeError(failed[0])
+        return entry
+
+    def insert_many(self, entries):
+        """One upsert per month touched (most imports span a handful of months)."""
+        failed = {}
+        for query, update, positions in self._pushes(entries):
+            try:
+                db.mood_buckets.update_one(query, update, upsert=True)
+            except PyMongoError as e:
+                failed.update(dict.fromkeys(positions, str(e)))
+        return failed
+
+    def find_existing(self, user_id, timestamps):
+        timestamps = set(timestamps)
+        if not timestamps:
+            return []
+        buckets = db.mood_buckets.find(
+            {"user_id": user_id, "start": {"$lte": max(timestamps)}, "end": {"$gte": min(timestamps)}},
+            {"entries.timestamp": 1, "entries.mood": 1}
+        )
+        return [
+            (entry["timestamp"], entry["mood"])
+            for bucket in buckets for entry in bucket["entries"] if entry["timestamp"] in timestamps
+        ]
+
+    def _bucket_query(self, user_id, start, end, before):
+        query = {"user_id": user_id}
+        if start is not None:
+            query["end"] = {"$gte": start}
+        upper = {}
+        if end is not None:
+            upper["$lt"] = end
+        if before is not None:
+            upper["$lte"] = before[0]
+        if upper:
+            query["start"] = upper
+        return query
+
+    def _collect(self, limit, matches):
+        """
+        Merge buckets (arriving latest "end" first) into the newest `limit` entries.
+        send() each bucket; the generator returns once later buckets can't contribute.
+        """
+        newest = []  # min-heap of (timestamp, _id, entry), at most `limit` long
+        while True:
+            bucket = yield
+            if bucket is None or (len(newest) >= limit and bucket["end"] < newest[0][0]):
+                return [entry for _, _, entry in sorted(newest, key=lambda item: item[:2], reverse=True)]
+            for entry in self._flatten(bucket):
+                if matches(entry):
+                    item = (entry["timestamp"], entry["_id"], entry)
+                    if len(newest) < limit:
+                        heapq.heappush(newest, item)
+                    elif item[:2] > newest[0][:2]:
+                        heapq.heapreplace(newest, item)
+
+    @staticmethod
+    def _finish(collector, bucket=None):
+        try:
+            collector.send(bucket)
+        except StopIteration as stop:
+            return stop.value
+        return None
+
+    def page(self, user_id, limit, start=None, end=None, before=None):
+        collector = self._collect(limit, _page_conditions(start, end, before))
+        next(collector)
+        for bucket in db.mood_buckets.find(self._bucket_query(user_id, start, end, before)).sort("end", -1):
+            result = self._finish(collector, bucket)
+            if result is not None:
+                return result
+        return self._finish(collector)
+
+    async def page_async(self, database, user_id, limit, start=None, end=None, before=None):
+        collector = self._collect(limit, _page_conditions(start, end, before))
+        next(collector)
+        async for bucket in database.mood_buckets.find(self._bucket_query(user_id, start, end, before)).sort("end", -1):
+            result = self._finish(collector, bucket)
+            if result is not None:
+                return result
+        return self._finish(collector)
+
+    def iter_user(self, user_id, batch_size=1000, fields=None):
+        projection = None
+        if fields:
+            # The entry _id and timestamp are still needed to order spill buckets
+            entry_fields = {"_id", "timestamp", *fields} - {"user_id"}
+            projection = {"user_id": 1, "month": 1, **{f"entries.{field}": 1 for field in entry_fields}}
+        # Buckets of different months never overlap in time; spill buckets of the same month may
+        cursor = db.mood_buckets.find({"user_id": user_id}, projection).sort([("month", 1), ("start", 1)]).batch_size(batch_size)
+        try:
+            for _, buckets in itertools.groupby(cursor, key=lambda bucket: bucket["month"]):
+                entries = [entry for bucket in buckets for entry in self._flatten(bucket)]
+                entries.sort(key=lambda entry: (entry["timestamp"], entry["_id"]))
+                yield from entries
+        finally:
+            cursor.close()
+
+    def entries_pipeline(self, user_id):
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$unwind": "$entries"},
+            {"$replaceRoot": {"newRoot": "$entries"}},
+        ]
+
+    def aggregate(self, pipeline):
+        return db.mood_buckets.aggregate(pipeline)
+
+    def has_string_timestamps(self, user_id):
+        # Entries are normalized to datetimes on the way in
+        return False
+
+    def scan_columns(self, batch_size=100000):
+        cursor = db.mood_buckets.find(
+            {}, {"_id": 0, "user_id": 1, "entries.mood": 1, "entries.timestamp": 1}
+        ).batch_size(max(1, batch_size // self.bucket_size))
+        user_ids, moods, timestamps = [], [], []
+        try:
+            for bucket in cursor:
+                user_ids.extend([bucket["user_id"]] * len(bucket["entries"]))
+                moods.extend(entry["mood"] for entry in bucket["entries"])
+                timestamps.extend(entry["timestamp"] for entry in bucket["entries"])
+                if len(user_ids) >= batch_size:
+                    yield user_ids, moods, timestamps
+                    user_ids, moods, timestamps = [], [], []
+        finally:
+            cursor.close()
+        if user_ids:
+            yield user_ids, moods, timestamps
+
+    def convert_string_timestamps(self, user_id=None, batch_size=1000):
+        """Entries are always packed with datetime timestamps (see migrate_user)."""
+        return 0
+
+    def user_ids(self):
+        return db.mood_buckets.distinct("user_id")
+
+    def delete_user(self, user_id):
+        return db.mood_buckets.delete_many({"user_id": user_id}).deleted_count
+
+STORES = {"documents": DocumentMoodStore, "buckets": BucketMoodStore}
+
+# ==== Store selection ====
+# Module-level like the database client: summaries are also rebuilt from CLI
+# commands and executor threads that have no app context.
+_store = DocumentMoodStore()
+
+def init_mood_store(app):
+    store = make_mood_store(app.config.get('MOODS_STORAGE', 'documents'), app.config.get('MOODS_BUCKET_SIZE', 500))
+    set_mood_store(store)
+    app.extensions['mood_store'] = store
+
+def make_mood_store(name, bucket_size=500):
+    if name not in STORES:
+        raise ValueError(f"Unknown MOODS_STORAGE {name!r}; expected one of {', '.join(STORES)}.")
+    return BucketMoodStore(bucket_size) if name == "buckets" else DocumentMoodStore()
+
+def set_mood_store(store):
+    global _store
+    _store = store
+
+def get_mood_store():
+    return _store
+
+# ==== Migration ====
+def migrate_user(user_id, source, target, batch_size=1000):
+    """
+    Copy one user's entries from source to target, replacing whatever the target
+    already holds for them (so re-running is safe). Returns the number copied.
+    Raises ValueError if the target is the active engine: it may hold entries
+    written since the last run that the source doesn't have.
+    """
+    from models.mood import to_datetime
+    if target.name == get_mood_store().name:
+        raise ValueError(f"{target.name} is the active mood store (MOODS_STORAGE); refusing to overwrite it.")
+    target.delete_user(user_id)
+    copied = 0
+    batch = []
+    for entry in source.iter_user(user_id, batch_size):
+        batch.append({
+            "_id": entry["_id"],
+            "user_id": user_id,
+            "mood": entry["mood"],
+            "timestamp": to_datetime(entry["timestamp"]),
+            "note": entry.get("note", ""),
+        })
+        if len(batch) >= batch_size:
+            copied += _copy_batch(target, batch)
+            batch = []
+    if batch:
+        copied += _copy_batch(target, batch)
+    return copied
+
+def _copy_batch(target, batch):
+    failed = target.insert_many(batch)
+    if failed:
+        raise RuntimeError(f"{len(failed)} entries failed to copy: {next(iter(failed.values()))}")
+    return len(batch)
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+from flask import current_app
+from pymongo import ReturnDocument
+from database import db
+from utils.search import InvertedIndex
+
+# ==== Catalog cache ====
+# The catalog version lives in db.catalog_versions ({"_id": "resources", "version": n}).
+# add_resource bumps it; every worker polls it cheaply and drops its cache when it moves.
+VERSION_ID = "resources"
+MAX_CACHED_TOPICS = 256
+# Field weights for ?q= search ranking
+SEARCH_FIELDS = {"title": 3.0, "topics": 2.0, "summary": 1.5, "content": 1.0}
+
+class ResourceCatalog:
+    """
+    Process-local cache of serialized GET /api/resources responses, keyed by topic.
+    Each entry is (version, body, etag) so clients can revalidate with If-None-Match.
+    """
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._index = None
+        self._index_version = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def version(self):
+        """Current catalog version, re-read from Mongo at most every poll_interval seconds."""
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.poll_interval:
+            doc = db.catalog_versions.find_one({"_id": VERSION_ID})
+            self._version = doc["version"] if doc else 0
+            self._checked_at = now
+        return self._version
+
+    def bump(self):
+        """Invalidate the catalog in every worker (call after changing db.resources)."""
+        doc = db.catalog_versions.find_one_and_update(
+            {"_id": VERSION_ID}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        with self._lock:
+            self._version = doc["version"]
+            self._checked_at = time.monotonic()
+            self._entries.clear()
+        return self._version
+
+    def add(self, resource):
+        """Record a newly inserted resource: bump the version and index it in place."""
+        previous = self._index_version
+        version = self.bump()
+        if self._index is not None and previous == version - 1:
+            self._index.add(str(resource["_id"]), resource)
+            self._index_version = version
+
+    def get(self, topic, load):
+        """
+        Return (body, etag) for a topic (None = whole catalog), calling
+        load(topic) -> payload dict to rebuild it when the version changed.
+        """
+        version = self.version()
+        entry = self._entries.get(topic)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        body = current_app.json.response(load(topic)).get_data()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            if len(self._entries) >= MAX_CACHED_TOPICS:
+                self._entries.clear()
+            self._entries[topic] = (version, body, etag)
+        return body, etag
+
+    def search_index(self):
+        """The full-text index, rebuilt only if the catalog changed in another worker."""
+        version = self.version()
+        if self._index is None or self._index_version != version:
+            with self._lock:
+                if self._index is None or self._index_version != version:
+                    index = InvertedIndex(SEARCH_FIELDS)
+                    for resource in db.resources.find({}):
+                        index.add(str(resource["_id"]), resource)
+                    self._index, self._index_version = index, version
+        return self._index
+
+    def search(self, query, page=1, per_page=20, topic=None):
+        """BM25-ranked page of resources matching `query` (last word matched as a prefix)."""
+        matches = (lambda resource: topic in resource.get("topics", [])) if topic else None
+        total, hits = self.search_index().search(
+            query, limit=per_page, offset=(page - 1) * per_page, filter=matches
+        )
+        return total, [dict(resource, score=round(score, 4)) for score, resource in hits]
+
+    def stats(self):
+        return {
+            "version": self._version,
+            "topics": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "indexed": len(self._index) if self._index is not None else 0,
+        }
+
+# ==== App integration ====
+def init_resource_catalog(app):
+    app.extensions['resource_catalog'] = ResourceCatalog(
+        poll_interval=app.config.get('RESOURCES_VERSION_POLL_SECONDS', 1.0),
+    )
+
+def get_resource_catalog():
+    if 'resource_catalog' not in current_app.extensions:
+        init_resource_catalog(current_app)
+    return current_app.extensions['resource_catalog']
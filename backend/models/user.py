@@ -0,0 +1,61 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import current_app
+from pymongo import ReturnDocument
+from database import db
+from utils.cache import TTLCache
+
+# ==== Account cache ====
+# GET /api/profile and GET /api/settings both read the user document without its
+# password hash, so one cache entry per user serves both. PUT handlers replace the
+# entry with the document returned by their write; other workers see the change
+# once their copy expires (USER_CACHE_TTL seconds).
+ACCOUNT_PROJECTION = {"password": 0}
+
+def init_user_cache(app):
+    app.extensions['user_cache'] = TTLCache(
+        maxsize=app.config.get('USER_CACHE_SIZE', 4096),
+        ttl=app.config.get('USER_CACHE_TTL', 30),
+    )
+
+def get_user_cache():
+    if 'user_cache' not in current_app.extensions:
+        init_user_cache(current_app)
+    return current_app.extensions['user_cache']
+
+def _user_filter(user_id):
+    """Users are keyed by ObjectId; tokens carry its string form."""
+    try:
+        return {"_id": ObjectId(user_id)}
+    except (InvalidId, TypeError):
+        return None
+
+def load_account(user_id):
+    """The user document without its password hash, or None if there is no such user."""
+    cache = get_user_cache()
+    account = cache.get(user_id)
+    if account is not None:
+        return account
+    query = _user_filter(user_id)
+    account = db.users.find_one(query, ACCOUNT_PROJECTION) if query else None
+    if account is not None:
+        cache.set(user_id, account)
+    return account
+
+def update_account(user_id, fields):
+    """
+    $set fields on the user and return the updated document in the same round
+    trip (None if there is no such user). Refreshes this worker's cache entry.
+    """
+    query = _user_filter(user_id)
+    if query is None:
+        return None
+    account = db.users.find_one_and_update(
+        query, {"$set": fields}, projection=ACCOUNT_PROJECTION, return_document=ReturnDocument.AFTER
+    )
+    cache = get_user_cache()
+    if account is None:
+        cache.pop(user_id)
+    else:
+        cache.set(user_id, account)
+    return account
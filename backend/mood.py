@@ -1,32 +1,16 @@
 from flask import Blueprint, request, jsonify, current_app
-from database import db
-import jwt
+from bson import ObjectId
+from utils.auth import require_auth
+from models.mood import record_mood, record_moods, to_datetime
+from models.mood_store import get_mood_store, make_mood_store, migrate_user, STORES
+from utils.json_stream import iter_json_array, iter_ndjson, StreamParseError
+import base64
+import click
 import datetime
+import json
 
 mood_bp = Blueprint('mood', __name__)
 
-# ==== Helper: JWT Auth Decorator ====
-def require_auth(f):
-    from functools import wraps
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            parts = request.headers['Authorization'].split()
-            if len(parts) == 2 and parts[0] == "Bearer":
-                token = parts[1]
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            request.user_id = data['user_id']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired.'}), 401
-        except Exception:
-            return jsonify({'error': 'Token is invalid.'}), 401
-        return f(*args, **kwargs)
-    return decorated
-
 # ==== Endpoints ====
 
 # POST /api/mood
@@ -43,7 +27,10 @@ def add_mood():
     if not timestamp:
         timestamp = datetime.datetime.utcnow()
     else:
-        timestamp = datetime.datetime.fromisoformat(timestamp)
+        try:
+            timestamp = to_datetime(timestamp)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid timestamp."}), 400
 
     mood_entry = {
         "user_id": user_id,
@@ -51,29 +38,232 @@ def add_mood():
         "timestamp": timestamp,
         "note": data.get('note', "")  # Optional field for user notes
     }
-    db.moods.insert_one(mood_entry)
-    mood_entry["_id"] = str(mood_entry["_id"])
+    get_mood_store().insert(mood_entry)
+    # Keep the precomputed dashboard summary in step with the new entry
+    record_mood(user_id, mood, timestamp, mood_entry["_id"])
     return jsonify({"mood": mood_entry}), 201
 
-# GET /api/moods?limit=30
+# ==== Bulk import ====
+
+def _parse_import_item(item, user_id):
+    """Validate one imported entry; returns (mood_entry, error)."""
+    if not isinstance(item, dict):
+        return None, "Entry must be an object."
+    mood = item.get('mood')
+    if not mood or not isinstance(mood, str):
+        return None, "Mood is required."
+    timestamp = item.get('timestamp')
+    if timestamp is None:
+        timestamp = datetime.datetime.utcnow()
+    else:
+        try:
+            # Naive UTC like the stored entries, so the duplicate check matches them
+            timestamp = to_datetime(timestamp)
+        except (TypeError, ValueError):
+            return None, "Invalid timestamp."
+    note = item.get('note', "")
+    if not isinstance(note, str):
+        return None, "Note must be a string."
+    return {"user_id": user_id, "mood": mood, "timestamp": timestamp, "note": note}, None
+
+def _import_batch(user_id, batch, results, seen):
+    """Dedupe a batch of (index, entry) against the batch and stored moods, then insert it."""
+    store = get_mood_store()
+    seen.update(store.find_existing(user_id, [entry["timestamp"] for _, entry in batch]))
+    to_insert = []
+    for index, entry in batch:
+        # Mongo stores datetimes with millisecond precision
+        key = (entry["timestamp"].replace(microsecond=entry["timestamp"].microsecond // 1000 * 1000), entry["mood"])
+        if key in seen:
+            results[index] = {"index": index, "status": "duplicate"}
+            continue
+        seen.add(key)
+        to_insert.append((index, entry))
+    if not to_insert:
+        return
+    failed = store.insert_many([entry for _, entry in to_insert])
+    inserted = []
+    for position, (index, entry) in enumerate(to_insert):
+        if position in failed:
+            results[index] = {"index": index, "status": "error", "error": failed[position]}
+        else:
+            results[index] = {"index": index, "status": "inserted"}
+            inserted.append((entry["mood"], entry["timestamp"], entry["_id"]))
+    # One summary update per batch rather than per row
+    if inserted:
+        record_moods(user_id, inserted)
+
+# POST /api/moods/import
+@mood_bp.route('/moods/import', methods=['POST'])
+@require_auth
+def import_moods():
+    """
+    Receives: a JSON array of { mood, timestamp, note } objects, or the same
+    objects as NDJSON (Content-Type: application/x-ndjson). The body is parsed
+    as a stream, deduplicated on (timestamp, mood) and written in batches.
+    Returns: { inserted, duplicates, invalid, errors, truncated, results: [{index, status, error?}] }
+    truncated means MOODS_IMPORT_MAX_ITEMS was reached. A body that turns out
+    malformed part-way is a 400 with the same fields plus "error"; the entries
+    before the fault are kept, and re-sending the fixed body skips them as duplicates.
+    """
+    user_id = request.user_id
+    batch_size = current_app.config.get('MOODS_IMPORT_BATCH_SIZE', 500)
+    max_items = current_app.config.get('MOODS_IMPORT_MAX_ITEMS', 10000)
+    if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+        items = iter_ndjson(request.stream)
+    else:
+        items = iter_json_array(request.stream)
+
+    results = {}
+    seen = set()
+    batch = []
+    truncated = False
+    parse_error = None
+    try:
+        for index, item in enumerate(items):
+            if index >= max_items:
+                truncated = True
+                break
+            entry, error = _parse_import_item(item, user_id)
+            if error:
+                results[index] = {"index": index, "status": "invalid", "error": error}
+                continue
+            batch.append((index, entry))
+            if len(batch) >= batch_size:
+                _import_batch(user_id, batch, results, seen)
+                batch = []
+    except StreamParseError as e:
+        if not results and not batch:
+            return jsonify({"error": f"Invalid import body: {e}"}), 400
+        parse_error = f"Invalid import body: {e}"
+    if batch:
+        _import_batch(user_id, batch, results, seen)
+
+    results = [results[index] for index in sorted(results)]
+    statuses = [result["status"] for result in results]
+    body = {
+        "inserted": statuses.count("inserted"),
+        "duplicates": statuses.count("duplicate"),
+        "invalid": statuses.count("invalid"),
+        "errors": statuses.count("error"),
+        "truncated": truncated,
+        "results": results
+    }
+    if parse_error:
+        return jsonify(dict(body, error=parse_error)), 400
+    return jsonify(body), 200
+
+# ==== Helpers: keyset pagination ====
+DEFAULT_PAGE_SIZE = 30
+
+def encode_cursor(mood):
+    """Opaque cursor pointing just past a mood in (timestamp, _id) order."""
+    raw = json.dumps({"ts": to_datetime(mood["timestamp"]).isoformat(), "id": str(mood["_id"])})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    raw = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    return to_datetime(raw["ts"]), ObjectId(raw["id"])
+
+def parse_page_args(args, max_limit):
+    """
+    Parse GET /api/moods query args into (limit, start, end, before).
+    Raises ValueError with a client-facing message on bad input.
+    """
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    limit = max(1, min(limit, max_limit))
+    try:
+        # Naive UTC like the stored timestamps; the buckets engine compares them in Python
+        start = to_datetime(args["from"]) if args.get("from") else None
+        end = to_datetime(args["to"]) if args.get("to") else None
+    except ValueError:
+        raise ValueError("from/to must be ISO timestamps.")
+    before = None
+    if args.get("cursor"):
+        try:
+            before = decode_cursor(args["cursor"])
+        except Exception:
+            raise ValueError("Invalid cursor.")
+    return limit, start, end, before
+
+def moods_page(moods, limit):
+    """Shape up to limit + 1 newest-first moods into the GET /api/moods body."""
+    next_cursor = encode_cursor(moods[limit - 1]) if len(moods) > limit else None
+    return {"moods": moods[limit - 1::-1], "next_cursor": next_cursor}  # Return oldest first
+
+# GET /api/moods?limit=30&cursor=...&from=...&to=...
 @mood_bp.route('/moods', methods=['GET'])
 @require_auth
 def get_moods():
-    user_id = request.user_id
-    limit = int(request.args.get("limit", 30))  # Default to last 30 moods
-    moods = (
-        db.moods.find({"user_id": user_id})
-        .sort("timestamp", -1)
-        .limit(limit)
-    )
-    mood_list = []
-    for mood in moods:
-        mood["_id"] = str(mood["_id"])
-        if isinstance(mood["timestamp"], datetime.datetime):
-            mood["timestamp"] = mood["timestamp"].isoformat()
-        mood_list.append(mood)
-    return jsonify({"moods": mood_list[::-1]}), 200  # Return oldest first
+    """
+    Pages backwards through a user's moods, newest page first.
+    Query params:
+      limit  - page size (default 30, capped at MOODS_MAX_LIMIT)
+      cursor - next_cursor from the previous page
+      from   - ISO timestamp, inclusive lower bound
+      to     - ISO timestamp, exclusive upper bound
+    Returns: { moods: [...oldest first], next_cursor: string or null }
+    """
+    try:
+        limit, start, end, before = parse_page_args(request.args, current_app.config.get('MOODS_MAX_LIMIT', 100))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Fetch one extra entry to know whether an older page exists
+    moods = get_mood_store().page(request.user_id, limit + 1, start, end, before)
+    return jsonify(moods_page(moods, limit)), 200
+
+# ==== CLI: storage engine migration ====
+
+# flask mood migrate-storage --to buckets [--from documents] [--user-id ID]
+@mood_bp.cli.command('migrate-storage')
+@click.option('--to', 'target', type=click.Choice(list(STORES)), required=True, help="Engine to copy entries into.")
+@click.option('--from', 'source', type=click.Choice(list(STORES)), default=None,
+              help="Engine to copy from (default: the other one).")
+@click.option('--user-id', default=None, help="Only migrate this user.")
+@click.option('--batch-size', default=1000, show_default=True)
+def migrate_storage_command(target, source, user_id, batch_size):
+    """
+    Copy mood entries between storage engines, user by user. Re-running is safe
+    until MOODS_STORAGE is switched to the target, after which it is refused;
+    the source is left untouched.
+    """
+    source = source or next(name for name in STORES if name != target)
+    if source == target:
+        raise click.BadParameter("--from and --to must differ.")
+    bucket_size = current_app.config.get('MOODS_BUCKET_SIZE', 500)
+    source_store, target_store = make_mood_store(source, bucket_size), make_mood_store(target, bucket_size)
+    users = [user_id] if user_id else source_store.user_ids()
+    total = 0
+    try:
+        for uid in users:
+            total += migrate_user(uid, source_store, target_store, batch_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Copied {total} entries for {len(users)} users from {source} to {target}.")
+
+# ==== CLI: legacy timestamps ====
+
+# flask mood convert-timestamps [--user-id ID]
+@mood_bp.cli.command('convert-timestamps')
+@click.option('--user-id', default=None, help="Only convert this user's entries.")
+@click.option('--batch-size', default=1000, show_default=True)
+def convert_timestamps_command(user_id, batch_size):
+    """
+    Rewrite legacy ISO string timestamps as datetimes. GET /api/moods filters and
+    pages on datetimes, so entries still stored as strings are left out until this has run.
+    """
+    converted = get_mood_store().convert_string_timestamps(user_id, batch_size)
+    click.echo(f"Converted {converted} string timestamps.")
 
 # ==== Example Usage ====
 # POST /api/mood with JSON: { "mood": "happy", "timestamp": "...", "note": "Felt good after walk" }
 # GET /api/moods (Authorization header required)
+# GET /api/moods?limit=50&cursor=<next_cursor>   (older page)
+# GET /api/moods?from=2024-01-01T00:00:00&to=2024-02-01T00:00:00
+# POST /api/moods/import with a JSON array (or NDJSON) of { "mood": ..., "timestamp": ..., "note": ... }
+# flask --app app mood migrate-storage --to buckets   (then set MOODS_STORAGE=buckets)
+# flask --app app mood convert-timestamps   (once, for entries stored before timestamps were datetimes)
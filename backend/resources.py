@@ -1,8 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response
 from database import db
+from models.resource import get_resource_catalog
 
 resources_bp = Blueprint('resources', __name__)
 
+# ==== Helpers ====
+def load_resources(topic=None):
+    query = {}
+    if topic:
+        query["topics"] = topic  # Assume each resource has a 'topics': [str, ...]
+    return {"resources": list(db.resources.find(query))}
+
+def search_resources(query, topic=None):
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        per_page = max(1, min(int(request.args.get("per_page", 20)), 100))
+    except ValueError:
+        return jsonify({"error": "page and per_page must be integers."}), 400
+    total, resources = get_resource_catalog().search(query, page, per_page, topic)
+    return jsonify({"resources": resources, "total": total, "page": page, "per_page": per_page}), 200
+
 # ==== Endpoints ====
 
 # GET /api/resources
@@ -10,16 +27,19 @@ resources_bp = Blueprint('resources', __name__)
 def get_resources():
     """
     Returns a list of mental health resources, articles, or tips.
-    Optionally supports ?topic= for filtering by topic/tag.
+    Optionally supports ?topic= for filtering by topic/tag,
+    and ?q= (with &page= and &per_page=) for ranked full-text search.
+    Responses carry a strong ETag; If-None-Match gets a 304 while the catalog is unchanged.
     """
     topic = request.args.get("topic")
-    query = {}
-    if topic:
-        query["topics"] = topic  # Assume each resource has a 'topics': [str, ...]
-    resources = list(db.resources.find(query))
-    for res in resources:
-        res["_id"] = str(res["_id"])
-    return jsonify({"resources": resources}), 200
+    if request.args.get("q"):
+        return search_resources(request.args["q"], topic)
+    if not current_app.config.get('RESOURCES_CACHE', True):
+        return jsonify(load_resources(topic)), 200
+    body, etag = get_resource_catalog().get(topic, load_resources)
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 # POST /api/resources (for admin use)
 @resources_bp.route('/resources', methods=['POST'])
@@ -33,6 +53,7 @@ def add_resource():
     if not all(field in data for field in required_fields):
         return jsonify({"error": "Missing fields."}), 400
     db.resources.insert_one(data)
+    get_resource_catalog().add(data)
     return jsonify({"message": "Resource added."}), 201
 
 # ==== Example Resource Schema ====
@@ -1,31 +1,9 @@
-from flask import Blueprint, request, jsonify, current_app
-from database import db
-import jwt
+from flask import Blueprint, request, jsonify
+from models.user import load_account, update_account
+from utils.auth import require_auth
 
 settings_bp = Blueprint('settings', __name__)
 
-# ==== Helper: JWT Auth Decorator ====
-def require_auth(f):
-    from functools import wraps
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            parts = request.headers['Authorization'].split()
-            if len(parts) == 2 and parts[0] == "Bearer":
-                token = parts[1]
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            request.user_id = data['user_id']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired.'}), 401
-        except Exception:
-            return jsonify({'error': 'Token is invalid.'}), 401
-        return f(*args, **kwargs)
-    return decorated
-
 # ==== Endpoints ====
 
 # GET /api/settings
@@ -33,7 +11,7 @@ def require_auth(f):
 @require_auth
 def get_settings():
     user_id = request.user_id
-    user = db.users.find_one({"_id": user_id}, {"settings": 1})
+    user = load_account(user_id)  # cached briefly per worker, shared with GET /api/profile
     if not user or "settings" not in user:
         # Return defaults if not set
         return jsonify({
@@ -56,14 +34,10 @@ def update_settings():
     if not settings_update:
         return jsonify({"error": "No valid fields to update."}), 400
 
-    result = db.users.update_one(
-        {"_id": user_id},
-        {"$set": {f"settings.{k}": v for k, v in settings_update.items()}}
-    )
-    if result.matched_count == 0:
+    # Update and read back in one round trip
+    user = update_account(user_id, {f"settings.{k}": v for k, v in settings_update.items()})
+    if user is None:
         return jsonify({"error": "User not found."}), 404
-
-    user = db.users.find_one({"_id": user_id}, {"settings": 1})
     return jsonify({"settings": user.get("settings", {})}), 200
 
 # ==== Example Usage ====
@@ -0,0 +1,40 @@
+"""Shared fixtures: the app against an in-memory mongomock database (run pytest from backend/)."""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+mongomock = pytest.importorskip("mongomock")
+
+@pytest.fixture
+def app(monkeypatch):
+    """A loaded app with its own empty database; admission control off."""
+    monkeypatch.setenv("ADMISSION_ENABLED", "false")
+    import database
+    client = mongomock.MongoClient()
+    database.set_client_factory(lambda uri, **options: client)
+    from app import create_app
+    from utils.startup import ensure_loaded
+    app = ensure_loaded(create_app())
+    app.config['TESTING'] = True
+    yield app
+    database.set_client_factory(database.MongoClient)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def db(app):
+    import database
+    return database.get_db()
+
+@pytest.fixture
+def signup(client):
+    """signup(email) -> (user_id, auth headers) for a new account."""
+    def signup(email="user@example.com"):
+        response = client.post("/api/signup", json={"name": "Test", "email": email, "password": "correct horse"})
+        assert response.status_code == 201, response.get_json()
+        body = response.get_json()
+        return str(body["user"]["_id"]), {"Authorization": f"Bearer {body['token']}"}
+    return signup
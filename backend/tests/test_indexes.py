@@ -0,0 +1,91 @@
+"""Guards for the query-shape registry in indexes.py.
+
+The explain() checks need a real mongod (mongomock has no query planner): set
+MONGO_TEST_URI to run them against a throwaway database on that server.
+"""
+import os
+import uuid
+import pytest
+from pymongo import MongoClient
+from indexes import INDEXES, QUERY_SHAPES, IndexVerificationError, ensure_indexes, verify_query_plans
+
+class FakeCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+class FakeCollection:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.plan)
+
+class FakeDatabase:
+    """Answers every explain() with the same winning plan."""
+    def __init__(self, plan, collections=()):
+        self.plan = plan
+        self.collections = set(collections)
+
+    def list_collection_names(self):
+        return sorted(self.collections)
+
+    def create_collection(self, name):
+        self.collections.add(name)
+
+    def __getitem__(self, name):
+        return FakeCollection(self.plan)
+
+IXSCAN = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "probe"}}
+
+def test_every_shape_targets_an_indexed_collection():
+    for name, collection, _ in QUERY_SHAPES:
+        assert INDEXES.get(collection), name
+
+def test_index_plans_pass():
+    plans = verify_query_plans(FakeDatabase(IXSCAN))
+    assert set(plans) == {name for name, _, _ in QUERY_SHAPES}
+    assert all(stages == ["FETCH", "IXSCAN"] for stages in plans.values())
+
+def test_collscan_fails():
+    with pytest.raises(IndexVerificationError, match="COLLSCAN"):
+        verify_query_plans(FakeDatabase({"stage": "COLLSCAN"}))
+
+@pytest.mark.parametrize("plan", [{"stage": "EOF"}, {}])
+def test_eof_plan_is_inconclusive(plan):
+    with pytest.raises(IndexVerificationError, match="inconclusive"):
+        verify_query_plans(FakeDatabase(plan))
+
+def test_missing_collections_are_created():
+    database = FakeDatabase(IXSCAN, collections=["users"])
+    verify_query_plans(database)
+    assert {collection for _, collection, _ in QUERY_SHAPES} <= database.collections
+
+@pytest.fixture
+def mongo_db():
+    uri = os.environ.get("MONGO_TEST_URI")
+    if not uri:
+        pytest.skip("MONGO_TEST_URI not set")
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    name = f"mindcare_test_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+def test_real_plans_use_indexes(mongo_db):
+    ensure_indexes(mongo_db)
+    ensure_indexes(mongo_db)  # idempotent
+    plans = verify_query_plans(mongo_db)
+    assert all("IXSCAN" in stages for stages in plans.values())
+
+def test_real_plans_fail_without_indexes(mongo_db):
+    with pytest.raises(IndexVerificationError, match="COLLSCAN"):
+        verify_query_plans(mongo_db)
@@ -0,0 +1,41 @@
+import threading
+import database
+from utils import metrics
+from utils.metrics import CommandMetrics, Registry, registry
+
+def requests_total(endpoint, status):
+    return registry.counters.get(("http_requests_total", (("endpoint", endpoint), ("status", status))), 0)
+
+def test_first_lazy_request_is_counted(monkeypatch):
+    monkeypatch.setenv("APP_LAZY_LOAD", "true")
+    from app import create_app
+    app = create_app()
+    assert not app.extensions['deferred_loader'].loaded
+    before = requests_total("unmatched", 404)
+    assert app.test_client().get("/api/no-such-route").status_code == 404
+    assert requests_total("unmatched", 404) == before + 1
+    assert app.test_client().get("/api/no-such-route").status_code == 404
+    assert requests_total("unmatched", 404) == before + 2
+
+def test_command_listener_registered_once(app):
+    from app import create_app
+    from utils.startup import ensure_loaded
+    ensure_loaded(create_app())
+    listeners = [listener for listener in database._event_listeners if isinstance(listener, CommandMetrics)]
+    assert listeners == [metrics.command_metrics]
+
+def test_concurrent_updates_are_not_lost():
+    local = Registry()
+
+    def work():
+        for _ in range(2000):
+            local.inc("hits")
+            local.observe("latency", (), 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert local.counters[("hits", ())] == 16000
+    assert local.histograms[("latency", ())].count == 16000
@@ -0,0 +1,77 @@
+"""
+The precomputed summary (incremental updates + rebuilds) must always match a
+recomputation from the stored entries, and the pipeline engine must match the scan.
+"""
+import datetime
+import random
+import pytest
+from models.mood import (
+    compute_summary, dashboard_payload, pipeline_summary, rebuild_summary, record_mood, scan_summary,
+)
+from models.mood_store import get_mood_store
+
+MOODS = ["happy", "sad", "calm", "anxious", "tired"]
+START = datetime.datetime(2024, 3, 1, 8)
+
+def assert_consistent(user_id):
+    scanned = dashboard_payload(scan_summary(user_id))
+    assert dashboard_payload(pipeline_summary(user_id)) == scanned
+    assert dashboard_payload(compute_summary(user_id)) == scanned
+
+def random_timestamp(rng, day):
+    timestamp = START + datetime.timedelta(days=day, minutes=rng.randint(0, 16 * 60))
+    if rng.random() < 0.3:
+        # Same instant written with an offset
+        return timestamp.replace(tzinfo=datetime.timezone.utc).astimezone(
+            datetime.timezone(datetime.timedelta(hours=rng.choice([-5, 2, 9])))
+        ).isoformat()
+    return timestamp.isoformat() + ("Z" if rng.random() < 0.3 else "")
+
+@pytest.mark.parametrize("seed", range(5))
+def test_summary_matches_scan_after_mixed_writes(client, signup, seed):
+    rng = random.Random(seed)
+    user_id, headers = signup(f"user{seed}@example.com")
+    day = 0
+    for _ in range(40):
+        action = rng.random()
+        # Mostly forward in time, sometimes backdated or skipping days
+        day = max(0, day + rng.choice([0, 0, 1, 1, 2, -3]))
+        if action < 0.5:
+            response = client.post("/api/mood", headers=headers,
+                                   json={"mood": rng.choice(MOODS), "timestamp": random_timestamp(rng, day)})
+            assert response.status_code == 201
+        elif action < 0.85:
+            items = [{"mood": rng.choice(MOODS), "timestamp": random_timestamp(rng, day + rng.randint(-2, 2))}
+                     for _ in range(rng.randint(1, 25))]
+            # Re-sent items are duplicates and must not be counted twice
+            items += rng.sample(items, rng.randint(0, len(items)))
+            response = client.post("/api/moods/import", headers=headers, json=items)
+            assert response.status_code == 200
+        else:
+            rebuild_summary(user_id)
+        assert_consistent(user_id)
+
+def test_rebuild_between_insert_and_incremental_update(app, signup):
+    """A rebuild that already counted an entry must not have it counted again."""
+    user_id, _ = signup()
+    store = get_mood_store()
+    for i in range(35):
+        entry = {"user_id": user_id, "mood": MOODS[i % 3], "timestamp": START + datetime.timedelta(hours=i), "note": ""}
+        store.insert(entry)
+        if i % 4 == 0:
+            rebuild_summary(user_id)
+        record_mood(user_id, entry["mood"], entry["timestamp"], entry["_id"])
+        assert_consistent(user_id)
+    assert compute_summary(user_id)["total_moods"] == 35
+
+def test_summary_rebuilt_when_missing(app, signup, db):
+    user_id, _ = signup()
+    get_mood_store().insert_many([
+        {"user_id": user_id, "mood": "happy", "timestamp": START + datetime.timedelta(days=i), "note": ""}
+        for i in range(10)
+    ])
+    db.mood_summaries.delete_many({"user_id": user_id})
+    summary = compute_summary(user_id)
+    assert summary["total_moods"] == 10
+    assert summary["longest_streak"] == 10
+    assert_consistent(user_id)
@@ -0,0 +1,239 @@
+import datetime
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request, jsonify
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from database import db
+from utils.auth import decode_token, get_bearer_token
+
+logger = logging.getLogger(__name__)
+
+# ==== Default limits ====
+# Per Flask endpoint:
+#   rate        - tokens refilled per second for each user (or client IP)
+#   burst       - bucket size, i.e. requests allowed back to back
+#   concurrency - requests served at once across all users (per process)
+#   key         - "user" (token's user_id, else IP) or "ip"
+# Behind a load balancer set TRUSTED_PROXIES, or every client shares the
+# balancer's IP and therefore one login/signup bucket.
+# Override with ADMISSION_LIMITS='{"dashboard.get_dashboard": {"rate": 5}}'.
+DEFAULT_LIMITS = {
+    "auth.login": {"rate": 0.2, "burst": 10, "concurrency": 32, "key": "ip"},
+    "auth.signup": {"rate": 0.05, "burst": 5, "concurrency": 16, "key": "ip"},
+    "dashboard.get_dashboard": {"rate": 2, "burst": 20, "concurrency": 64},
+    "chatbot.chatbot_reply": {"rate": 1, "burst": 20, "concurrency": 64},
+    "mood.import_moods": {"rate": 0.05, "burst": 3, "concurrency": 4},
+    "export.export_history": {"rate": 0.05, "burst": 3, "concurrency": 4},
+    "chatbot.chat_history": {"rate": 0.2, "burst": 5, "concurrency": 8},
+}
+
+class AdmissionRejected(Exception):
+    """A request was shed; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.message = message
+
+# ==== Token bucket stores ====
+def _refill(tokens, updated, now, rate, burst):
+    """Bucket level after refilling since `updated`; returns (tokens, wait_seconds)."""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate if rate > 0 else math.inf
+
+class MemoryBucketStore:
+    """Buckets in this process only; least recently used keys are evicted past max_keys."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        """Take one token; returns 0 if admitted, else seconds until a token is available."""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, wait = _refill(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self):
+        return {"tracked_keys": len(self._buckets)}
+
+class MongoBucketStore:
+    """
+    Buckets shared by every worker in a MongoDB collection, updated with
+    compare-and-set on the previous "updated" time. Idle buckets expire
+    through the TTL index on expires_at (see indexes.py).
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, collection="rate_limits"):
+        self.collection = collection
+
+    def take(self, key, rate, burst):
+        for _ in range(self.MAX_ATTEMPTS):
+            now = time.time()
+            current = db[self.collection].find_one({"_id": key})
+            tokens, updated = (current["tokens"], current["updated"]) if current else (burst, now)
+            tokens, wait = _refill(tokens, updated, now, rate, burst)
+            # Keep the bucket around until it would have refilled anyway
+            idle = min(burst / rate, 86400) if rate else 86400
+            update = {
+                "tokens": tokens,
+                "updated": now,
+                "expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=idle),
+            }
+            if current is None:
+                try:
+                    db[self.collection].insert_one(dict(update, _id=key))
+                except DuplicateKeyError:
+                    continue
+                return wait
+            result = db[self.collection].update_one({"_id": key, "updated": current["updated"]}, {"$set": update})
+            if result.matched_count == 1:
+                return wait
+        # Lost every race for this key: it is being hammered, so shed it
+        return 1.0 / rate if rate else 1.0
+
+    def stats(self):
+        return {}
+
+# ==== Admission controller ====
+class AdmissionController:
+    """Per-user token buckets plus per-endpoint concurrency limits."""
+
+    def __init__(self, limits, store, retry_after=1):
+        self.limits = limits
+        self.store = store
+        self.retry_after = retry_after
+        self.counters = {"admitted": 0, "rejected_rate": 0, "rejected_concurrency": 0}
+        self.by_endpoint = {}
+        self._lock = threading.Lock()
+        self._slots = {
+            endpoint: threading.BoundedSemaphore(limit["concurrency"])
+            for endpoint, limit in limits.items() if limit.get("concurrency")
+        }
+
+    def _count(self, endpoint, outcome):
+        with self._lock:
+            self.counters[outcome] += 1
+            counts = self.by_endpoint.setdefault(endpoint, dict.fromkeys(self.counters, 0))
+            counts[outcome] += 1
+
+    def enter(self, endpoint, user_key, ip_key):
+        """
+        Admit a request or raise AdmissionRejected (429 over the rate, 503 when
+        the endpoint is saturated). Returns True if leave() must be called.
+        """
+        limit = self.limits.get(endpoint)
+        if limit is None:
+            return False
+        if limit.get("rate"):
+            key = ip_key if limit.get("key") == "ip" or not user_key else user_key
+            try:
+                wait = self.store.take(f"{endpoint}:{key}", limit["rate"], limit.get("burst", 1))
+            except PyMongoError:
+                # Fail open: an unavailable shared store must not take the API down with it
+                logger.exception("Rate limit store unavailable")
+                wait = 0
+            if wait > 0:
+                self._count(endpoint, "rejected_rate")
+                raise AdmissionRejected(429, max(1, math.ceil(wait)), "Too many requests, please slow down.")
+        slots = self._slots.get(endpoint)
+        if slots is not None and not slots.acquire(blocking=False):
+            self._count(endpoint, "rejected_concurrency")
+            raise AdmissionRejected(503, self.retry_after, "Server is busy, please retry shortly.")
+        self._count(endpoint, "admitted")
+        return slots is not None
+
+    def leave(self, endpoint):
+        self._slots[endpoint].release()
+
+    def stats(self):
+        return dict(self.counters, **self.store.stats())
+
+# ==== App integration ====
+def forwarded_client(peer, forwarded_for, trusted_proxies):
+    """
+    Client address as werkzeug's ProxyFix sees it: the entry `trusted_proxies`
+    hops from the end of X-Forwarded-For, else the connecting peer.
+    """
+    if trusted_proxies and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",")]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return peer
+
+def _user_key():
+    """The token's user_id for per-user buckets; None for anonymous or bad tokens."""
+    token = get_bearer_token()
+    if not token:
+        return None
+    try:
+        return decode_token(token).get("user_id")
+    except Exception:
+        return None
+
+def init_admission(app):
+    """Apply ADMISSION_LIMITS to every request; rejected requests never reach the view."""
+    limits = {endpoint: dict(limit) for endpoint, limit in DEFAULT_LIMITS.items()}
+    for endpoint, overrides in json.loads(app.config.get('ADMISSION_LIMITS') or "{}").items():
+        limits.setdefault(endpoint, {}).update(overrides)
+    if app.config.get('ADMISSION_BACKEND') == 'mongodb':
+        store = MongoBucketStore()
+    else:
+        store = MemoryBucketStore(max_keys=app.config.get('ADMISSION_MAX_KEYS', 100000))
+    controller = AdmissionController(limits, store, retry_after=app.config.get('ADMISSION_RETRY_AFTER', 1))
+    app.extensions['admission'] = controller
+    per_ip = sorted(endpoint for endpoint, limit in limits.items() if limit.get("key") == "ip")
+    if per_ip and not app.config.get('TRUSTED_PROXIES'):
+        logger.warning("Admission control keys %s on the connecting IP and TRUSTED_PROXIES is 0: "
+                       "behind a load balancer every client shares one bucket.", ", ".join(per_ip))
+
+    @app.before_request
+    def _admit():
+        endpoint = request.endpoint
+        # CORS preflights resolve to the same endpoint but must not spend tokens
+        if request.method == "OPTIONS" or endpoint not in controller.limits:
+            return None
+        try:
+            # remote_addr is the real client when TRUSTED_PROXIES applies ProxyFix (app.py)
+            if controller.enter(endpoint, _user_key(), request.remote_addr):
+                g._admission_endpoint = endpoint
+        except AdmissionRejected as e:
+            response = jsonify({"error": e.message})
+            response.status_code = e.status
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response
+        return None
+
+    @app.after_request
+    def _release_on_close(response):
+        # Streamed bodies (exports, chat history) are still being sent after the
+        # request is torn down; keep the slot until the server closes the response
+        endpoint = g.pop('_admission_endpoint', None)
+        if endpoint is not None:
+            response.call_on_close(lambda: controller.leave(endpoint))
+        return response
+
+    @app.teardown_request
+    def _release(exc):
+        # Only if no response was produced (after_request never ran)
+        endpoint = g.pop('_admission_endpoint', None)
+        if endpoint is not None:
+            controller.leave(endpoint)
+
+    return controller
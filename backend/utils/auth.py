@@ -0,0 +1,114 @@
+import hashlib
+import time
+from functools import wraps
+from flask import request, jsonify, current_app
+from bson import ObjectId
+from bson.errors import InvalidId
+from database import db
+from utils.cache import TTLCache
+import jwt
+
+# ==== Setup ====
+def init_auth(app):
+    """Create the verified-token and known-user caches for this app."""
+    app.extensions['auth'] = {
+        "tokens": TTLCache(
+            maxsize=app.config.get('AUTH_TOKEN_CACHE_SIZE', 4096),
+            ttl=app.config.get('AUTH_TOKEN_CACHE_TTL', 300),
+        ),
+        "users": TTLCache(
+            maxsize=app.config.get('AUTH_USER_CACHE_SIZE', 4096),
+            ttl=app.config.get('AUTH_USER_CACHE_TTL', 60),
+        ),
+    }
+
+def _caches():
+    if 'auth' not in current_app.extensions:
+        init_auth(current_app)
+    return current_app.extensions['auth']
+
+def auth_cache_stats():
+    """Hit/miss counters for the token and user caches."""
+    return {name: cache.stats() for name, cache in _caches().items()}
+
+# ==== Token verification ====
+def get_bearer_token():
+    """Return the token from an "Authorization: Bearer <token>" header, if any."""
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) == 2 and parts[0] == "Bearer":
+        return parts[1]
+    return None
+
+def decode_token(token):
+    """
+    Verify a JWT, reusing the result of a previous verification of the same token.
+    Cached entries never outlive the token's own "exp" claim.
+    Raises the same jwt exceptions as jwt.decode.
+    """
+    cache = _caches()["tokens"]
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    payload = cache.get(key)
+    if payload is not None:
+        if "exp" in payload and payload["exp"] <= time.time():
+            cache.pop(key)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return payload
+
+    payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+    ttl = payload["exp"] - time.time() if "exp" in payload else None
+    cache.set(key, payload, ttl)
+    return payload
+
+def user_exists(user_id):
+    """Check the user still exists, caching positive answers briefly."""
+    cache = _caches()["users"]
+    if cache.get(user_id):
+        return True
+    try:
+        found = db.users.find_one({'_id': ObjectId(user_id)}, {'_id': 1}) is not None
+    except InvalidId:
+        return False
+    if found:
+        cache.set(user_id, True)
+    return found
+
+# ==== Decorator ====
+def require_auth(f=None, *, check_user=None):
+    """
+    Require a valid JWT and set request.user_id.
+    With check_user=True (or AUTH_CHECK_USER config) also verify the user exists.
+    Usable as @require_auth or @require_auth(check_user=True).
+    """
+    if f is None:
+        return lambda fn: require_auth(fn, check_user=check_user)
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = get_bearer_token()
+        if not token:
+            return jsonify({'error': 'Token is missing!'}), 401
+        try:
+            data = decode_token(token)
+            user_id = data['user_id']
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token expired.'}), 401
+        except Exception:
+            return jsonify({'error': 'Token is invalid.'}), 401
+        verify_user = current_app.config.get('AUTH_CHECK_USER', False) if check_user is None else check_user
+        if verify_user and not user_exists(user_id):
+            return jsonify({'error': 'User not found.'}), 404
+        # Attach user_id to request context
+        request.user_id = user_id
+        return f(*args, **kwargs)
+    return decorated
+
+def require_admin(f):
+    """require_auth, plus the user's current email must be listed in ADMIN_EMAILS."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        from models.user import load_account
+        account = load_account(request.user_id)
+        if account is None or account.get("email") not in current_app.config.get('ADMIN_EMAILS', ()):
+            return jsonify({'error': 'Admin access required.'}), 403
+        return f(*args, **kwargs)
+    return require_auth(decorated)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from flask import current_app
+from database import db
+
+DEFAULT_RESPONSE = "I'm here to listen. Tell me more about what's on your mind."
+
+# ==== Rule compilation ====
+# A rule table looks like data/intents.json:
+# {
+#   "default_response": "...",
+#   "rules": [
+#     {"name": "stress", "priority": 30, "keywords": ["stress*", "burned out"],
+#      "response": "...", "mood_responses": {"sad": "..."}}
+#   ]
+# }
+# Keywords match whole words; a trailing "*" also matches longer words ("stress*" -> "stressed").
+
+_END = ""
+
+def _trie_pattern(node):
+    """Regex for a keyword trie, so alternatives share prefixes instead of being tried one by one."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    terminal = node.get(_END)
+    if terminal == "prefix":
+        branches.append(r"\w*")
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal == "exact":
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+class CompiledRules:
+    """A rule table compiled into one word-boundary regex, matched in a single pass."""
+
+    def __init__(self, rules, default_response=DEFAULT_RESPONSE):
+        self.rules = rules
+        self.default_response = default_response
+        self.exact = {}
+        self.prefixes = {}
+        trie = {}
+        for index, rule in enumerate(rules):
+            rank = (rule.get("priority", 0), -index)
+            for keyword in rule.get("keywords", []):
+                is_prefix = keyword.endswith("*")
+                keyword = _normalize(keyword.rstrip("*"))
+                if not keyword:
+                    continue
+                table = self.prefixes if is_prefix else self.exact
+                if keyword not in table or rank > table[keyword][0]:
+                    table[keyword] = (rank, rule)
+                node = trie
+                for char in keyword:
+                    node = node.setdefault(char, {})
+                if node.get(_END) != "prefix":
+                    node[_END] = "prefix" if is_prefix else "exact"
+        self.max_prefix = max((len(k) for k in self.prefixes), default=0)
+        self.regex = re.compile(r"\b" + _trie_pattern(trie) + r"\b") if trie else None
+
+    def _lookup(self, text):
+        best = self.exact.get(text)
+        for length in range(min(len(text), self.max_prefix), 0, -1):
+            candidate = self.prefixes.get(text[:length])
+            if candidate and (best is None or candidate[0] > best[0]):
+                best = candidate
+        return best
+
+    def match(self, message):
+        """Return the highest-priority rule whose keyword appears in the message, or None."""
+        if self.regex is None:
+            return None
+        best = None
+        for found in self.regex.finditer(_normalize(message)):
+            candidate = self._lookup(found.group(0))
+            if candidate and (best is None or candidate[0] > best[0]):
+                best = candidate
+        return best[1] if best else None
+
+    def respond(self, message, mood=None):
+        rule = self.match(message)
+        if rule is None:
+            return self.default_response
+        return rule.get("mood_responses", {}).get(mood, rule["response"])
+
+# ==== Loading and hot reload ====
+class IntentEngine:
+    """
+    Loads rules from a JSON file or, with a "mongodb:<collection>" source,
+    from a collection of rule documents. The source is re-checked at most
+    every `reload_interval` seconds and recompiled when it changed.
+    """
+
+    def __init__(self, source, reload_interval=5.0):
+        self.source = source
+        self.reload_interval = reload_interval
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.compiled = CompiledRules([])
+        self.reload(force=True)
+
+    def _read(self):
+        """Return (fingerprint, rules, default_response) for the current source."""
+        if self.source.startswith("mongodb:"):
+            rules = list(db[self.source.split(":", 1)[1]].find({}, {"_id": 0}))
+            raw = json.dumps(rules, sort_keys=True, default=str)
+            return hashlib.sha256(raw.encode('utf-8')).hexdigest(), rules, DEFAULT_RESPONSE
+        fingerprint = os.stat(self.source).st_mtime_ns
+        if fingerprint == self._fingerprint:
+            return fingerprint, None, None
+        with open(self.source, encoding='utf-8') as f:
+            table = json.load(f)
+        return fingerprint, table["rules"], table.get("default_response", DEFAULT_RESPONSE)
+
+    def reload(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            fingerprint, rules, default_response = self._read()
+            if fingerprint != self._fingerprint and rules is not None:
+                self.compiled = CompiledRules(rules, default_response)
+                self._fingerprint = fingerprint
+
+    def respond(self, message, mood=None):
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            try:
+                self.reload()
+            except (OSError, ValueError, KeyError):
+                pass  # Keep serving the last good rule table
+        return self.compiled.respond(message, mood)
+
+# ==== App integration ====
+DEFAULT_INTENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "intents.json")
+
+def init_intents(app):
+    app.extensions['intents'] = IntentEngine(
+        app.config.get('CHATBOT_INTENTS_SOURCE') or DEFAULT_INTENTS_PATH,
+        reload_interval=app.config.get('CHATBOT_INTENTS_RELOAD_SECONDS', 5.0),
+    )
+
+def get_intent_engine():
+    if 'intents' not in current_app.extensions:
+        init_intents(current_app)
+    return current_app.extensions['intents']
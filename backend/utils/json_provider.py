@@ -0,0 +1,63 @@
+import base64
+import datetime
+import json
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+def encode_default(value):
+    """Types MongoDB documents carry that JSON doesn't know about."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    return DefaultJSONProvider.default(value)
+
+if orjson is not None:
+    def dumps_bytes(obj, indent=False, sort_keys=True):
+        """Serialize to UTF-8 JSON bytes (ObjectId, datetime and bytes included)."""
+        options = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=encode_default, option=options)
+
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj, indent=False, sort_keys=True):
+        """Serialize to UTF-8 JSON bytes (ObjectId, datetime and bytes included)."""
+        return json.dumps(
+            obj, default=encode_default, sort_keys=sort_keys, ensure_ascii=False,
+            indent=2 if indent else None, separators=None if indent else (",", ":"),
+        ).encode('utf-8')
+
+    loads = json.loads
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when installed. Encodes ObjectId,
+    datetime and bytes natively, so views can jsonify Mongo documents as-is.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.keys() - {"indent", "separators"}:
+            kwargs.setdefault("default", encode_default)
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, indent=bool(kwargs.get("indent"))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,91 @@
+import codecs
+import json
+
+class StreamParseError(ValueError):
+    """The request body is not a well-formed JSON array / NDJSON stream."""
+
+def iter_ndjson(stream):
+    """Yield one decoded value per non-blank line of a binary stream."""
+    for line_number, line in enumerate(iter(stream.readline, b""), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise StreamParseError(f"Line {line_number}: {e}") from e
+
+# Truncated tokens (literals like "-Infinity", partial exponents, \\u escapes)
+# fit in this many characters; a value or error closer than that to the end of
+# the buffer is re-read once more of the body has arrived
+LOOKAHEAD = 16
+
+def _truncated(error):
+    return len(error.doc) - error.pos < LOOKAHEAD or error.msg.startswith("Unterminated string")
+
+def iter_json_array(stream, chunk_size=64 * 1024, max_element_size=1024 * 1024):
+    """
+    Yield the elements of a top-level JSON array read incrementally from a
+    binary stream, so only one chunk plus one element is held in memory.
+    Elements longer than max_element_size characters are refused.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    position = 0
+    exhausted = False
+
+    def fill():
+        nonlocal buffer, position, exhausted
+        chunk = stream.read(chunk_size)
+        exhausted = not chunk
+        buffer = buffer[position:] + text_decoder.decode(chunk, final=exhausted)
+        position = 0
+
+    def peek():
+        """Skip whitespace; the next character, or "" at the end of the body."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if exhausted:
+                return ""
+            fill()
+
+    def read_value():
+        nonlocal position
+        if not peek():
+            raise StreamParseError("Unexpected end of JSON array.")
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if exhausted or not _truncated(e):
+                    raise StreamParseError(f"Invalid array element: {e.msg}.") from e
+            else:
+                if exhausted or len(buffer) - end >= LOOKAHEAD:
+                    position = end
+                    return value
+            if len(buffer) - position > max_element_size:
+                raise StreamParseError(f"Array element larger than {max_element_size} characters.")
+            fill()
+
+    if peek() != "[":
+        raise StreamParseError("Expected a JSON array.")
+    position += 1
+    if peek() == "]":
+        position += 1
+    else:
+        while True:
+            yield read_value()
+            separator = peek()
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise StreamParseError("Unexpected end of JSON array." if not separator
+                                       else f"Expected ',' or ']', got {separator!r}.")
+    if peek():
+        raise StreamParseError("Unexpected data after the JSON array.")
@@ -0,0 +1,235 @@
+import bisect
+import logging
+import threading
+import time
+from flask import Response
+from pymongo import monitoring
+import database
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds (Prometheus "le" bounds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# ==== Metric types ====
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions (callers hold the registry lock)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    """
+    Labelled counters, gauges and histograms, rendered in Prometheus text format.
+    Updates are read-modify-writes shared by all request threads, so they take
+    the lock; it is held for a dict lookup and an addition or two.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, labels, value):
+        with self._lock:
+            self.gauges[(name, labels)] = value
+
+    def add(self, name, labels, amount):
+        with self._lock:
+            self.gauges[(name, labels)] = self.gauges.get((name, labels), 0) + amount
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[(name, labels)] = Histogram()
+            histogram.observe(value)
+
+    def render(self, extra_gauges=()):
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+            histograms = [(key, (histogram.counts[:], histogram.sum, histogram.count, histogram.bounds))
+                          for key, histogram in self.histograms.items()]
+
+        for (name, labels), value in sorted(counters):
+            header(name, "counter")
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges + list(extra_gauges)):
+            header(name, "gauge")
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), (counts, total, count, bounds) in sorted(histograms, key=lambda item: item[0]):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket in zip(bounds, counts):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+registry = Registry()
+registry.describe("http_request_duration_seconds", "Request latency by blueprint and route.")
+registry.describe("http_requests_total", "Requests by route and status code.")
+registry.describe("http_requests_in_flight", "Requests currently being served.")
+registry.describe("mongodb_command_duration_seconds", "MongoDB command latency by collection and operation.")
+registry.describe("mongodb_slow_commands_total", "MongoDB commands slower than MONGO_SLOW_COMMAND_MS.")
+
+# ==== Mongo command timing ====
+class CommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by collection and operation (e.g. moods.find)."""
+
+    def __init__(self, slow_seconds=0.1):
+        self.slow_seconds = slow_seconds
+        self._pending = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        self._pending[(event.connection_id, event.request_id)] = (event.database_name, collection)
+
+    def _finish(self, event, failed):
+        database_name, collection = self._pending.pop((event.connection_id, event.request_id), (event.database_name, "-"))
+        seconds = event.duration_micros / 1e6
+        labels = (("collection", collection), ("command", event.command_name))
+        registry.observe("mongodb_command_duration_seconds", labels, seconds)
+        if failed:
+            registry.inc("mongodb_command_failures_total", labels)
+        if seconds >= self.slow_seconds:
+            registry.inc("mongodb_slow_commands_total", labels)
+            logger.warning("Slow MongoDB command %s.%s on %s took %.1f ms",
+                           collection, event.command_name, database_name, seconds * 1000)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+# ==== Flask instrumentation ====
+def _component_gauges(app):
+    """Stats already kept by other components, exposed as gauges."""
+    sources = {
+        "mongodb_pool": database.pool_metrics.stats(),
+    }
+    if app.extensions.get('auth'):
+        for name, cache in app.extensions['auth'].items():
+            sources[f"auth_{name}_cache"] = cache.stats()
+    for name in ('passwords', 'chatlog_buffer', 'resource_catalog', 'admission', 'user_cache'):
+        component = app.extensions.get(name)
+        if component is not None:
+            sources[name] = component.stats()
+    for prefix, stats in sources.items():
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield (f"mindcare_{prefix}_{key}", ()), value
+    if app.extensions.get('admission'):
+        for endpoint, counts in app.extensions['admission'].by_endpoint.items():
+            for outcome, value in counts.items():
+                yield ("mindcare_admission_requests", (("endpoint", endpoint), ("outcome", outcome))), value
+
+# Where RequestMetrics finds Flask's request once the app has returned
+REQUEST_KEY = "mindcare.metrics.request"
+
+class RequestMetrics:
+    """
+    WSGI middleware timing each request and counting it by endpoint and status.
+    One wrapper costs less than three Flask hooks; the endpoint is read back
+    from the request that init_metrics' request class leaves in the environ.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        statuses = []
+
+        def record_status(status, headers, exc_info=None):
+            statuses.append(status)
+            return start_response(status, headers, exc_info)
+
+        registry.add("http_requests_in_flight", (), 1)
+        start = time.perf_counter()
+        try:
+            return self.wsgi_app(environ, record_status)
+        finally:
+            seconds = time.perf_counter() - start
+            registry.add("http_requests_in_flight", (), -1)
+            request = environ.pop(REQUEST_KEY, None)
+            if statuses and request is not None:
+                endpoint = request.endpoint or "unmatched"
+                registry.observe(
+                    "http_request_duration_seconds",
+                    (("blueprint", request.blueprint or "app"), ("endpoint", endpoint), ("method", request.method)),
+                    seconds,
+                )
+                registry.inc("http_requests_total", (("endpoint", endpoint), ("status", int(statuses[-1][:3]))))
+
+# One command listener per process: the registry is global, so a listener per
+# app would count every command once for each create_app()
+command_metrics = None
+
+def init_metrics(app):
+    """Record per-route latency, status counts and in-flight requests; serve GET /api/metrics."""
+    global command_metrics
+    slow_seconds = app.config.get('MONGO_SLOW_COMMAND_MS', 100) / 1000
+    if command_metrics is None:
+        command_metrics = CommandMetrics(slow_seconds=slow_seconds)
+        database.add_event_listener(command_metrics)
+    else:
+        command_metrics.slow_seconds = slow_seconds
+    app.extensions['metrics'] = registry
+
+    class MetricsRequest(app.request_class):
+        def __init__(self, environ, *args, **kwargs):
+            super().__init__(environ, *args, **kwargs)
+            # Flask clears environ["werkzeug.request"] when the request ends
+            environ[REQUEST_KEY] = self
+
+    app.request_class = MetricsRequest
+    app.wsgi_app = RequestMetrics(app.wsgi_app)
+
+    def metrics():
+        body = registry.render(extra_gauges=list(_component_gauges(app)))
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/api/metrics", "metrics", metrics, methods=["GET"])
@@ -0,0 +1,89 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+import bcrypt
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued."""
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL),
+    so a burst of logins can only occupy `workers` cores. Jobs beyond
+    `max_pending` are rejected straight away instead of queueing.
+    """
+
+    def __init__(self, workers=2, max_pending=16, rounds=12):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Pools don't survive fork(); start a fresh one in each worker process
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+                    self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordPoolBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash_async(self, password):
+        return self.submit(self._hash, password)
+
+    def hash(self, password):
+        return self.hash_async(password).result()
+
+    def verify_async(self, password, hashed):
+        return self.submit(bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    def verify(self, password, hashed):
+        return self.verify_async(password, hashed).result()
+
+    def needs_rehash(self, hashed):
+        """True if the hash was made with a different cost factor than configured."""
+        try:
+            return int(hashed.split(b"$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def _hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "rounds": self.rounds,
+            "rejected": self.rejected,
+        }
+
+# ==== App integration ====
+def init_passwords(app):
+    app.extensions['passwords'] = PasswordHasher(
+        workers=app.config.get('BCRYPT_POOL_WORKERS', 2),
+        max_pending=app.config.get('BCRYPT_MAX_PENDING', 16),
+        rounds=app.config.get('BCRYPT_ROUNDS', 12),
+    )
+
+def get_hasher():
+    if 'passwords' not in current_app.extensions:
+        init_passwords(current_app)
+    return current_app.extensions['passwords']
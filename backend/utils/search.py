@@ -0,0 +1,205 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or the to with you your".split())
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking over weighted fields.
+    Documents can be added one at a time; nothing is rebuilt per query.
+    The last query term also matches as a prefix, for type-ahead.
+
+    Top-k results come from the threshold algorithm over per-term postings
+    sorted by score: the lists are read best first, in step, and reading
+    stops once no unread document can beat the current k-th result. A query
+    on a common term then scores a few dozen documents rather than every
+    posting. A term's list is sorted the second time it is queried and dropped
+    by the next add; queries over at most exhaustive_postings postings, or
+    with a term seen for the first time, just score every match.
+    """
+
+    def __init__(self, fields, k1=1.2, b=0.75, max_prefix_terms=50, max_cached_terms=2000,
+                 exhaustive_postings=2000):
+        self.fields = fields  # {field: weight}
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_terms = max_prefix_terms
+        self.max_cached_terms = max_cached_terms
+        self.exhaustive_postings = exhaustive_postings
+        self.postings = {}    # term -> {doc_id: weighted term frequency}
+        self.lengths = {}     # doc_id -> weighted document length
+        self.docs = {}        # doc_id -> stored document
+        self.terms = []       # sorted vocabulary, for prefix lookups
+        self.total_length = 0.0
+        self._impacts = {}    # term -> [(score without idf, doc_id), ...] best first, None once queried
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _field_text(self, value):
+        if isinstance(value, (list, tuple)):
+            return " ".join(str(item) for item in value)
+        return str(value) if value is not None else ""
+
+    def add(self, doc_id, doc):
+        frequencies = {}
+        for field, weight in self.fields.items():
+            for token in tokenize(self._field_text(doc.get(field))):
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+        with self._lock:
+            # Any change moves the average length, so every cached score is stale
+            self._impacts = {}
+            if doc_id in self.docs:
+                self._remove(doc_id)
+            for term, frequency in frequencies.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    bisect.insort(self.terms, term)
+                postings[doc_id] = frequency
+            length = sum(frequencies.values())
+            self.lengths[doc_id] = length
+            self.total_length += length
+            self.docs[doc_id] = doc
+
+    def _remove(self, doc_id):
+        for term in list(self.postings):
+            postings = self.postings[term]
+            if postings.pop(doc_id, None) is not None and not postings:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+        self.total_length -= self.lengths.pop(doc_id)
+        del self.docs[doc_id]
+
+    def _expand(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        expanded = []
+        for term in self.terms[start:start + self.max_prefix_terms]:
+            if not term.startswith(prefix):
+                break
+            expanded.append(term)
+        return expanded
+
+    def _term_score(self, doc_id, frequency, average_length):
+        """BM25 contribution of one posting, without the term's idf."""
+        norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+        return frequency * (self.k1 + 1) / (frequency + norm)
+
+    def _sorted_postings(self, impacts, term, average_length):
+        """A term's postings as (score without idf, doc_id), best first."""
+        ranked = impacts.get(term)
+        if ranked is None:
+            ranked = sorted(
+                ((self._term_score(doc_id, frequency, average_length), doc_id)
+                 for doc_id, frequency in self.postings[term].items()),
+                reverse=True,
+            )
+            if len(impacts) >= self.max_cached_terms:
+                impacts.clear()
+            impacts[term] = ranked
+        return ranked
+
+    def search(self, query, limit=20, offset=0, prefix=True, filter=None):
+        """Return (total_matches, [(score, doc), ...]) for one page of results."""
+        tokens = tokenize(query)
+        if not tokens:
+            return 0, []
+        # add() mutates the postings, lengths and vocabulary in place. Scoring is
+        # pure Python and holds the GIL anyway, so holding the lock costs searches
+        # no parallelism
+        with self._lock:
+            return self._search(tokens, limit, offset, prefix, filter)
+
+    def _search(self, tokens, limit, offset, prefix, filter):
+        if not self.docs:
+            return 0, []
+        groups = [[token] for token in tokens[:-1]]
+        last = tokens[-1]
+        groups.append((self._expand(last) or [last]) if prefix else [last])
+
+        doc_count = len(self.docs)
+        average_length = self.total_length / doc_count or 1.0
+        terms = []  # (term, idf, postings)
+        for group in groups:
+            for term in group:
+                postings = self.postings.get(term)
+                if postings:
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    terms.append((term, idf, postings))
+        if sum(len(postings) for _, _, postings in terms) > self.exhaustive_postings:
+            impacts = self._impacts
+            # A term's postings are sorted the second time it is queried, so one-off
+            # queries cost no more than scoring everything
+            fresh = [term for term, _, _ in terms if term not in impacts]
+            for term in fresh:
+                impacts[term] = None
+            if not fresh:
+                return self._search_top(terms, offset + limit, offset, filter, average_length, impacts)
+        return self._search_all(terms, offset + limit, offset, filter, average_length)
+
+    def _score(self, terms, doc_id, average_length):
+        score = 0.0
+        for _, idf, postings in terms:
+            frequency = postings.get(doc_id)
+            if frequency:
+                score += idf * self._term_score(doc_id, frequency, average_length)
+        return score
+
+    def _search_all(self, terms, k, offset, filter, average_length):
+        """Score every matching document."""
+        k1, b, lengths = self.k1, self.b, self.lengths
+        scores = {}
+        for _, idf, postings in terms:
+            for doc_id, frequency in postings.items():
+                # Inlined _term_score(), the same expression so both paths rank alike
+                norm = k1 * (1 - b + b * lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (frequency * (k1 + 1) / (frequency + norm))
+        if filter is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if filter(self.docs[doc_id])}
+        top = heapq.nlargest(k, ((score, doc_id) for doc_id, score in scores.items()))[offset:]
+        return len(scores), [(score, self.docs[doc_id]) for score, doc_id in top]
+
+    def _search_top(self, terms, k, offset, filter, average_length, impacts):
+        """Threshold algorithm: read the best-first lists in step until the top k are settled."""
+        if len(terms) == 1 and filter is None:
+            total = len(terms[0][2])
+        else:
+            matched = set().union(*(postings for _, _, postings in terms))
+            total = len(matched) if filter is None else sum(1 for doc_id in matched if filter(self.docs[doc_id]))
+        if not total or k <= 0:
+            return total, []
+        lists = [(idf, self._sorted_postings(impacts, term, average_length)) for term, idf, _ in terms]
+        top = []  # min-heap of (score, doc_id), at most k long
+        seen = set()
+        depth = 0
+        while True:
+            # Unread documents score at most the sum of the scores at this depth
+            threshold = 0.0
+            for idf, ranked in lists:
+                if depth >= len(ranked):
+                    continue
+                threshold += idf * ranked[depth][0]
+                doc_id = ranked[depth][1]
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if filter is not None and not filter(self.docs[doc_id]):
+                    continue
+                item = (self._score(terms, doc_id, average_length), doc_id)
+                if len(top) < k:
+                    heapq.heappush(top, item)
+                elif item > top[0]:
+                    heapq.heapreplace(top, item)
+            if not threshold or (len(top) >= k and top[0][0] > threshold):
+                break
+            depth += 1
+        page = sorted(top, reverse=True)[offset:]
+        return total, [(score, self.docs[doc_id]) for score, doc_id in page]
@@ -0,0 +1,60 @@
+import threading
+import time
+
+# ==== Deferred app loading ====
+# create_app() only sets config and the health/readiness routes; load_app()
+# (extensions, blueprints, PyMongo and friends) runs on the first request that
+# needs it. Until then GET /api/health is answered here, so a new worker is live
+# as soon as Flask is imported. Flask only allows setup before its first
+# request, which is why this wraps app.wsgi_app rather than hooking a request.
+LIVENESS_PATH = "/api/health"
+LIVENESS_BODY = b'{"status":"ok"}\n'
+
+class DeferredLoader:
+    """WSGI middleware that runs load(app) once, before the first request reaches Flask."""
+
+    def __init__(self, app, load):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.load = load
+        self.loaded = False
+        self.load_seconds = None
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self):
+        if self.loaded:
+            return
+        with self._lock:
+            if not self.loaded:
+                started = time.perf_counter()
+                self.load(self.app)
+                self.load_seconds = time.perf_counter() - started
+                self.loaded = True
+
+    def __call__(self, environ, start_response):
+        if not self.loaded:
+            if environ.get("PATH_INFO") == LIVENESS_PATH and environ.get("REQUEST_METHOD") == "GET":
+                start_response("200 OK", [
+                    ("Content-Type", "application/json"),
+                    ("Content-Length", str(len(LIVENESS_BODY))),
+                ])
+                return [LIVENESS_BODY]
+            self.ensure_loaded()
+            # Middleware that load() wrapped around this loader (request metrics)
+            # sees the request that triggered the load as well
+            if self.app.wsgi_app is not self:
+                return self.app.wsgi_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+def defer_loading(app, load):
+    loader = DeferredLoader(app, load)
+    app.wsgi_app = loader
+    app.extensions['deferred_loader'] = loader
+    return loader
+
+def ensure_loaded(app):
+    """Finish loading now, e.g. before using the app's extensions outside a request."""
+    loader = app.extensions.get('deferred_loader')
+    if loader is not None:
+        loader.ensure_loaded()
+    return app
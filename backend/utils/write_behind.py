@@ -0,0 +1,140 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from database import db
+
+logger = logging.getLogger(__name__)
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process buffer that writes documents to a collection in the
+    background with insert_many(ordered=False), flushing once `batch_size`
+    documents are queued or `flush_interval` seconds have passed.
+
+    When the buffer is full, put() waits up to `put_timeout` seconds and then
+    writes the document itself, so callers slow down instead of losing data.
+    """
+
+    def __init__(self, get_collection, max_size=10000, batch_size=500, flush_interval=0.5, put_timeout=1.0):
+        self.get_collection = get_collection
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stats = {
+            "flushes": 0,
+            "written": 0,
+            "failed": 0,
+            "overflow_writes": 0,
+            "last_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+            "total_flush_seconds": 0.0,
+        }
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        # Threads don't survive fork(); each worker process starts its own flusher
+        if self._pid == os.getpid():
+            return
+        with self._flush_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_size)
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def put(self, doc):
+        self._ensure_started()
+        try:
+            self._queue.put(doc, timeout=self.put_timeout)
+        except queue.Full:
+            self._stats["overflow_writes"] += 1
+            self.get_collection().insert_one(doc)
+
+    def put_nowait(self, doc):
+        """Queue a document without blocking; returns False if the buffer is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            return False
+        return True
+
+    def _drain(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Give the batch a chance to fill before writing it
+            deadline = time.monotonic() + self.flush_interval
+            while self._queue.qsize() < self.batch_size - 1 and time.monotonic() < deadline:
+                if self._stop.wait(0.01):
+                    break
+            self._write(self._drain(first))
+
+    def _write(self, batch):
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            self.get_collection().insert_many(batch, ordered=False)
+            self._stats["written"] += len(batch)
+        except Exception:
+            logger.exception("Write-behind flush of %d documents failed", len(batch))
+            self._stats["failed"] += len(batch)
+        elapsed = time.perf_counter() - start
+        self._stats["flushes"] += 1
+        self._stats["last_flush_seconds"] = elapsed
+        self._stats["total_flush_seconds"] += elapsed
+        self._stats["max_flush_seconds"] = max(self._stats["max_flush_seconds"], elapsed)
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+
+    def close(self):
+        """Stop the background flusher and write what is left (runs at exit)."""
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def stats(self):
+        return dict(self._stats, queue_depth=self._queue.qsize(), max_size=self.max_size)
+
+# ==== App integration ====
+def init_chatlog_buffer(app):
+    """Buffer chat log inserts unless CHATLOG_WRITE_BEHIND is disabled."""
+    if not app.config.get('CHATLOG_WRITE_BEHIND', True):
+        app.extensions['chatlog_buffer'] = None
+        return
+    app.extensions['chatlog_buffer'] = WriteBehindBuffer(
+        lambda: db.chatlogs,
+        max_size=app.config.get('CHATLOG_BUFFER_SIZE', 10000),
+        batch_size=app.config.get('CHATLOG_BATCH_SIZE', 500),
+        flush_interval=app.config.get('CHATLOG_FLUSH_INTERVAL', 0.5),
+    )